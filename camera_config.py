@@ -0,0 +1,100 @@
+"""RealSense L515 camera of the renders and its pinhole model
+
+Shared by render_scene.py, scene_setup.py, trajectory.py, depth_raycast.py
+and gt_geometry.py. NumPy only, so the projection math runs and is tested
+outside Blender.
+
+Blender cameras look along -Z with +Y up; a view frame is the four image
+corners (top right, bottom right, bottom left, top left) in camera space,
+as Camera.view_frame() returns them.
+"""
+import math
+
+import numpy as np
+
+# L515 640x480 Color stream intrinsic
+L515 = {
+    "img_w" : 640,
+    "img_h" : 480,
+    "cx" : 328.002136230469,
+    "cy" : 241.126098632813,
+    "fx" : 609.959655761719,
+    "fy" : 610.131958007813,
+    "fov_h" : 55.36,
+    "fov_v" : 42.94,
+    "sensor_width" : 2.47,
+    "min_depth" : 0.25,
+    "max_depth" : 9.0
+}
+
+
+def lens_mm(cfg):
+    """Blender focal length (mm) that renders at fx pixels: fx * sensor_width / img_w
+
+    Blender has square pixels, so the render has fy = fx (fy of the L515 is
+    0.03% larger); fov_h is the same lens rounded to 0.01 deg.
+    """
+    return cfg["fx"] * cfg["sensor_width"] / cfg["img_w"]
+
+
+def lens_shift(cfg):
+    """Blender shift_x / shift_y that put the principal point at (cx, cy)
+
+    Shift is a fraction of the larger image side; +x moves the view right
+    (principal point left), +y moves it up (principal point down).
+    """
+    size = max(cfg["img_w"], cfg["img_h"])
+    return (cfg["img_w"] / 2 - cfg["cx"]) / size, (cfg["cy"] - cfg["img_h"] / 2) / size
+
+
+def view_frame(cfg, distance=1.0):
+    """View frame of the camera setup_l515_camera builds (horizontal sensor fit), at z = -distance"""
+    width, height = cfg["img_w"], cfg["img_h"]
+    half_w = cfg["sensor_width"] / 2 / lens_mm(cfg) * distance
+    half_h = half_w * height / width
+    shift_x, shift_y = lens_shift(cfg)
+    x0, y0 = shift_x * 2 * half_w, shift_y * 2 * half_w
+    return [(x0 + half_w, y0 + half_h, -distance), (x0 + half_w, y0 - half_h, -distance),
+            (x0 - half_w, y0 - half_h, -distance), (x0 - half_w, y0 + half_h, -distance)]
+
+
+def render_hfov(cfg):
+    """Horizontal FOV (rad) of the Blender camera, i.e. of the rendered images"""
+    return 2 * math.atan(cfg["sensor_width"] / 2 / lens_mm(cfg))
+
+
+def frame_intrinsics(frame, width, height):
+    """(fx, fy, cx, cy) in pixels of a view frame
+
+    The pinhole projection of frame_rays: pixel centers at u = cx + fx * x / -z,
+    v = cy - fy * y / -z land on i + 0.5.
+    """
+    top_right, _, bottom_left, top_left = [np.asarray(v, dtype=np.float64) for v in frame]
+    d = -top_left[2]
+    x_left, x_right = top_left[0] / d, top_right[0] / d
+    y_top, y_bottom = top_left[1] / d, bottom_left[1] / d
+    fx, fy = width / (x_right - x_left), height / (y_top - y_bottom)
+    return fx, fy, -x_left * fx, y_top * fy
+
+
+def frame_rays(frame, width, height):
+    """(H*W, 3) camera-space ray per pixel center of a view frame, scaled to z = -1"""
+    top_right, bottom_right, bottom_left, top_left = [np.array(v, dtype=np.float64) for v in frame]
+    s = (np.arange(width) + 0.5) / width    # left -> right
+    t = (np.arange(height) + 0.5) / height  # top -> bottom
+    rays = (top_left[None, None, :]
+            + s[None, :, None] * (top_right - top_left)[None, None, :]
+            + t[:, None, None] * (bottom_left - top_left)[None, None, :])
+    rays /= -rays[..., 2:3]
+    return rays.reshape(-1, 3)
+
+
+def project(points, cam2world, fx, fy, cx, cy):
+    """World points -> pixel (u, v) and planar depth"""
+    R, t = cam2world[:3, :3], cam2world[:3, 3]
+    cam = (points - t) @ R
+    z = -cam[:, 2]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        u = cx + fx * cam[:, 0] / z
+        v = cy - fy * cam[:, 1] / z
+    return u, v, z
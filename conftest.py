@@ -0,0 +1,2 @@
+# manual scripts, not tests: test_.py opens an Open3D window, script_for_test.py needs Blender
+collect_ignore = ["test_.py", "script_for_test.py"]
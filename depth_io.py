@@ -0,0 +1,128 @@
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import OpenEXR, Imath
+
+# Blender writes 'R' (RGB/RGBA) or a single 'V'/'Y'/'Z' channel (BW)
+DEPTH_CHANNELS = ("R", "V", "Y", "Z")
+
+_HALF = Imath.PixelType(Imath.PixelType.HALF)
+_FLOAT = Imath.PixelType(Imath.PixelType.FLOAT)
+
+
+def depth_channel(header):
+    """Name of the channel holding depth in an EXR header"""
+    channels = header["channels"]
+    for name in DEPTH_CHANNELS:
+        if name in channels:
+            return name
+    return sorted(channels)[0]
+
+
+class DepthReader:
+    """Reads Blender depth EXRs into one preallocated buffer
+
+    width, height: expected frame size
+    dtype: np.float32, or np.float16 to halve the memory of the decoded map
+
+    read() returns the same buffer for every frame; it is overwritten by
+    the next read, so pass `out` (or copy) to keep several frames alive.
+    Half-float files are decoded as half and only widened in the single
+    copy into the buffer.
+    """
+
+    def __init__(self, width, height, dtype=np.float32):
+        self.width, self.height = width, height
+        self.dtype = np.dtype(dtype)
+        if self.dtype not in (np.float16, np.float32):
+            raise ValueError("dtype must be float16 or float32")
+        self.buffer = np.empty((height, width), dtype=self.dtype)
+
+    def read(self, depth_exr, out=None):
+        out = self.buffer if out is None else out
+        exr = OpenEXR.InputFile(depth_exr)
+        try:
+            header = exr.header()
+            dw = header['dataWindow']
+            size = (dw.max.x - dw.min.x + 1, dw.max.y - dw.min.y + 1)
+            assert size == (self.width, self.height), "depth map size error"
+
+            name = depth_channel(header)
+            if header["channels"][name].type == _HALF:
+                pixel_type, src_dtype = _HALF, np.float16
+            else:
+                pixel_type, src_dtype = _FLOAT, np.float32
+            raw = exr.channel(name, pixel_type)
+        finally:
+            exr.close()
+
+        np.copyto(out, np.frombuffer(raw, dtype=src_dtype).reshape(self.height, self.width),
+                  casting="same_kind")
+        return out
+
+
+# (name, channels, pixel type, compression) of the depth EXR layouts compared by benchmark()
+BENCHMARK_LAYOUTS = [
+    ("RGBA float ZIP", "RGBA", _FLOAT, "ZIP_COMPRESSION"),
+    ("V float ZIP", "V", _FLOAT, "ZIP_COMPRESSION"),
+    ("V half ZIP", "V", _HALF, "ZIP_COMPRESSION"),
+    ("V half DWAA", "V", _HALF, "DWAA_COMPRESSION"),
+]
+
+
+def write_exr(path, depth, channels="V", pixel_type=_FLOAT, compression="ZIP_COMPRESSION"):
+    """Depth map -> EXR, depth in every channel (alpha = 1 for RGBA, like Blender)"""
+    height, width = depth.shape
+    header = OpenEXR.Header(width, height)
+    header["channels"] = {name: Imath.Channel(pixel_type) for name in channels}
+    header["compression"] = Imath.Compression(getattr(Imath.Compression, compression))
+    with np.errstate(over="ignore"):  # 1e10 background -> inf in half, as in Blender's output
+        data = depth.astype(np.float16 if pixel_type == _HALF else np.float32)
+    alpha = np.ones_like(data)
+    exr = OpenEXR.OutputFile(path, header)
+    try:
+        exr.writePixels({name: (alpha if name == "A" else data).tobytes() for name in channels})
+    finally:
+        exr.close()
+
+
+def benchmark(depth_exr=None, repeats=20):
+    """Read time, file size and max error of every BENCHMARK_LAYOUTS layout
+
+    depth_exr: a rendered depth map to re-encode, default a synthetic 640x480 room
+    """
+    if depth_exr:
+        header = OpenEXR.InputFile(depth_exr).header()
+        dw = header["dataWindow"]
+        depth = DepthReader(dw.max.x - dw.min.x + 1, dw.max.y - dw.min.y + 1).read(depth_exr).copy()
+    else:
+        v, u = np.mgrid[0:480, 0:640].astype(np.float32)
+        depth = 2.0 + 4.0 * u / 640 + 0.5 * np.sin(v / 40.0)
+        depth[:48] = 1e10  # background
+    height, width = depth.shape
+    finite = depth < 1e9
+
+    reader = DepthReader(width, height)
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, channels, pixel_type, compression in BENCHMARK_LAYOUTS:
+            path = os.path.join(tmp, "depth.exr")
+            write_exr(path, depth, channels, pixel_type, compression)
+            reader.read(path)
+            start = time.perf_counter()
+            for _ in range(repeats):
+                decoded = reader.read(path)
+            ms = (time.perf_counter() - start) / repeats * 1000
+            error = np.abs(decoded[finite] - depth[finite]).max() if finite.any() else 0.0
+            print(f"[EXR {name:>14}] {width}x{height}: read {ms:.1f} ms, "
+                  f"{os.path.getsize(path) / 1024:.0f} KiB, max error {error * 1000:.2f} mm")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark depth EXR layouts with DepthReader")
+    parser.add_argument("depth_exr", nargs="?", default=None, help="depth map to re-encode (default: synthetic)")
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+    benchmark(args.depth_exr, args.repeats)
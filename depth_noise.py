@@ -0,0 +1,198 @@
+"""RealSense L515-like degradation of rendered depth maps
+
+Runs between the EXR load and the back-projection (preprocess_scene.py
+--noise). Every step is a whole-image NumPy operation on float32:
+
+1. range-dependent Gaussian noise, sigma(z) = sigma0 + sigma_k * z^2
+2. flying-pixel removal: a jump to a 4-neighbour larger than
+   edge_threshold * z marks a depth discontinuity, the pixels within
+   edge_radius of it are dropped (mixed foreground / background returns)
+3. dropout at grazing angles, the incidence angle comes from the depth
+   gradient (tilt of the local surface against the viewing ray)
+4. range limits and quantization to the sensor depth unit
+
+Invalid pixels are set to 0, which the back-projection already skips.
+The random stream of a frame only depends on (seed, frame index), so
+results do not change with the number of workers or the frame order.
+"""
+import argparse
+import time
+
+import numpy as np
+
+# defaults follow the L515 datasheet: 0.25-9 m, 0.25 mm depth unit, ~1-2 mm noise at 1 m
+L515_NOISE = {
+    "sigma0": 0.0010,          # m
+    "sigma_k": 0.0015,         # m / m^2
+    "edge_threshold": 0.03,    # depth jump to a neighbour, as a fraction of z, that marks a discontinuity
+    "edge_radius": 1,          # pixels dropped on each side of a discontinuity, beyond the jump itself
+    "grazing_start": 70.0,     # deg, dropout probability starts rising
+    "grazing_end": 85.0,       # deg, every pixel is dropped
+    "depth_unit": 0.00025,     # m
+    "min_depth": 0.25,
+    "max_depth": 9.0,
+}
+
+
+class DepthNoise:
+    """Vectorized depth degradation for one camera (fx, fy) and image size
+
+    Every frame draws 2 x H x W fresh random numbers by default. pool_size > 0
+    (opt-in, for throughput tests) takes them as a random window of seeded
+    pools made once, which roughly halves the frame time but correlates
+    frames: two windows of H x W overlap with probability ~2 H W / pool_size
+    (about 14% of frame pairs at 640x480 and pool_size 1 << 22), and
+    overlapping frames get the same noise on shifted pixels.
+    """
+
+    def __init__(self, width, height, fx, fy, seed=0, pool_size=0, **params):
+        unknown = set(params) - set(L515_NOISE)
+        if unknown:
+            raise ValueError(f"Unknown noise parameters {sorted(unknown)}")
+        self.params = dict(L515_NOISE, **params)
+        self.width, self.height = width, height
+        self.fx, self.fy = float(fx), float(fy)
+        self.seed = seed
+        self.cos_start = float(np.cos(np.deg2rad(self.params["grazing_start"])))
+        self.cos_end = float(np.cos(np.deg2rad(self.params["grazing_end"])))
+
+        size = width * height
+        self.pool_size = max(pool_size, size) if pool_size else 0
+        if self.pool_size:
+            rng = np.random.default_rng([seed, 2**32 - 1])  # separate stream from the frame rngs
+            self.normal_pool = rng.standard_normal(self.pool_size + size, dtype=np.float32)
+            self.uniform_pool = rng.random(self.pool_size + size, dtype=np.float32)
+
+        # scratch buffers, reused for every frame
+        shape = (height, width)
+        self._gx = np.empty(shape, dtype=np.float32)
+        self._gy = np.empty(shape, dtype=np.float32)
+        self._tmp = np.empty(shape, dtype=np.float32)
+        self._random = np.empty(shape, dtype=np.float32)
+        self._edges = np.empty(shape, dtype=bool)
+        self._jump_x = np.empty((height, width - 1), dtype=bool)
+        self._jump_y = np.empty((height - 1, width), dtype=bool)
+
+    def rng(self, frame_index):
+        return np.random.default_rng([self.seed, frame_index])
+
+    def _draw(self, rng, pool, fresh):
+        """(H, W) random numbers of this frame"""
+        if not self.pool_size:
+            fresh(dtype=np.float32, out=self._random)
+            return self._random
+        start = int(rng.integers(self.pool_size))
+        return pool[start:start + self.width * self.height].reshape(self.height, self.width)
+
+    def slopes(self, z):
+        """Squared surface tilt per pixel: (dz/du * fx / z)^2 + (dz/dv * fy / z)^2
+
+        Central differences of depth divided by the pixel footprint z / f;
+        one-sided differences at the border.
+        """
+        gx, gy, inv_z = self._gx, self._gy, self._tmp
+        np.subtract(z[:, 2:], z[:, :-2], out=gx[:, 1:-1])
+        gx[:, 0], gx[:, -1] = 2 * (z[:, 1] - z[:, 0]), 2 * (z[:, -1] - z[:, -2])
+        np.subtract(z[2:], z[:-2], out=gy[1:-1])
+        gy[0], gy[-1] = 2 * (z[1] - z[0]), 2 * (z[-1] - z[-2])
+        np.divide(0.5, z, out=inv_z)
+        gx *= inv_z
+        gx *= self.fx
+        gy *= inv_z
+        gy *= self.fy
+        np.square(gx, out=gx)
+        np.square(gy, out=gy)
+        gx += gy
+        return gx
+
+    def _jumps(self, a, b, out):
+        """|a - b| > edge_threshold * min(a, b) for neighbouring pixel slices a, b"""
+        diff = np.subtract(a, b)
+        np.abs(diff, out=diff)
+        near = np.minimum(a, b)
+        near *= self.params["edge_threshold"]
+        return np.greater(diff, near, out=out)
+
+    def edges(self, z):
+        """(H, W) True within edge_radius pixels of a depth discontinuity"""
+        r = int(self.params["edge_radius"])
+        edges = self._edges
+        edges[:] = False
+        jx = self._jumps(z[:, 1:], z[:, :-1], self._jump_x)
+        jy = self._jumps(z[1:], z[:-1], self._jump_y)
+        # jump between pixels j and j + 1 -> pixels j - r .. j + 1 + r
+        w, h = self.width - 1, self.height - 1
+        for k in range(-r, r + 2):
+            lo, hi = max(k, 0), min(w + k, w + 1)
+            edges[:, lo:hi] |= jx[:, lo - k:hi - k]
+            lo, hi = max(k, 0), min(h + k, h + 1)
+            edges[lo:hi] |= jy[lo - k:hi - k]
+        return edges
+
+    def apply(self, depth, frame_index=0, out=None):
+        """Degraded copy of depth (H, W), invalid pixels = 0"""
+        p = self.params
+        rng = self.rng(frame_index)
+        z = np.empty(depth.shape, dtype=np.float32) if out is None else out
+        np.copyto(z, depth, casting="same_kind")
+        valid = (z > p["min_depth"]) & (z < p["max_depth"])
+        np.copyto(z, np.float32(p["max_depth"]), where=~valid)  # keep gradients finite at the background
+
+        # flying pixels around discontinuities and grazing angles, judged on the clean depth
+        keep = ~self.edges(z)
+        keep &= valid
+        slope2 = self.slopes(z)
+        # cos(incidence) = 1 / sqrt(1 + slope^2), dropout probability rises linearly
+        # from 0 at grazing_start to 1 at grazing_end
+        cos = slope2
+        cos += 1.0
+        np.sqrt(cos, out=cos)
+        np.divide(1.0, cos, out=cos)
+        cos -= self.cos_end
+        cos *= 1.0 / (self.cos_start - self.cos_end)
+        keep &= self._draw(rng, self.uniform_pool if self.pool_size else None, rng.random) < cos
+
+        # range-dependent Gaussian noise
+        sigma = self._tmp
+        np.square(z, out=sigma)
+        sigma *= p["sigma_k"]
+        sigma += p["sigma0"]
+        sigma *= self._draw(rng, self.normal_pool if self.pool_size else None, rng.standard_normal)
+        z += sigma
+
+        # depth unit of the sensor, dropped pixels -> 0
+        z *= 1.0 / p["depth_unit"]
+        np.rint(z, out=z)
+        z *= p["depth_unit"]
+        z *= keep
+        return z
+
+
+def benchmark(width=640, height=480, frames=200, fx=609.96, fy=610.13, pool_size=0):
+    """Frames/s of DepthNoise.apply on a synthetic room-like depth map"""
+    v, u = np.mgrid[0:height, 0:width].astype(np.float32)
+    depth = 2.0 + 2.0 * u / width + 0.5 * np.sin(v / 40.0)   # slanted, curved wall
+    depth[height // 3: height // 2, width // 3: width // 2] = 1.2  # box in front of it
+    depth[: height // 10] = 1e10                                  # background
+    depth = depth.astype(np.float32)
+
+    noise = DepthNoise(width, height, fx, fy, pool_size=pool_size)
+    out = np.empty_like(depth)
+    noise.apply(depth, 0, out)
+    start = time.perf_counter()
+    for i in range(frames):
+        noise.apply(depth, i, out)
+    seconds = time.perf_counter() - start
+    dropped = np.mean(out == 0)
+    print(f"[Noise] {width}x{height}, pool {pool_size}: {frames / seconds:.0f} frames/s, "
+          f"{seconds / frames * 1000:.2f} ms/frame, {dropped:.1%} pixels invalid")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the L515 depth noise stage")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--pool", type=int, default=0, help="DepthNoise pool_size (correlated frames, see DepthNoise)")
+    args = parser.parse_args()
+    benchmark(args.width, args.height, args.frames, pool_size=args.pool)
@@ -0,0 +1,176 @@
+import argparse
+import sys
+import time
+
+import bpy
+from mathutils.bvhtree import BVHTree
+import numpy as np
+
+import camera_config
+
+# Cycles writes this Z for pixels that hit nothing
+BACKGROUND_DEPTH = 1e10
+
+
+def scene_bvh(depsgraph):
+    """One BVHTree over the evaluated, world-space triangles of all visible meshes
+
+    returns the tree and the pass_index of the object every triangle belongs to
+    """
+    verts_all, tris_all, owners, offset = [], [], [], 0
+    for obj in depsgraph.scene.objects:
+        if obj.type != 'MESH' or obj.hide_render:
+            continue
+        obj_eval = obj.evaluated_get(depsgraph)
+        mesh = obj_eval.to_mesh()
+        try:
+            mesh.calc_loop_triangles()
+            n_verts, n_tris = len(mesh.vertices), len(mesh.loop_triangles)
+            if n_verts == 0 or n_tris == 0:
+                continue
+            co = np.empty(n_verts * 3, dtype=np.float64)
+            mesh.vertices.foreach_get("co", co)
+            tris = np.empty(n_tris * 3, dtype=np.int64)
+            mesh.loop_triangles.foreach_get("vertices", tris)
+        finally:
+            obj_eval.to_mesh_clear()
+
+        M = np.array(obj_eval.matrix_world)
+        verts_all.append(co.reshape(-1, 3) @ M[:3, :3].T + M[:3, 3])
+        tris_all.append(tris.reshape(-1, 3) + offset)
+        owners.append(np.full(n_tris, obj.pass_index, dtype=np.int32))
+        offset += n_verts
+
+    verts = np.concatenate(verts_all)
+    tris = np.concatenate(tris_all)
+    tree = BVHTree.FromPolygons(verts.tolist(), tris.tolist(), all_triangles=True)
+    return tree, np.concatenate(owners)
+
+
+def view_intrinsics(cam_obj, scene, width, height):
+    """Pixel intrinsics of what Cycles / camera_rays render, from lens, sensor fit and shift"""
+    return camera_config.frame_intrinsics(cam_obj.data.view_frame(scene=scene), width, height)
+
+
+def camera_rays(cam_obj, scene, width, height):
+    """(H*W, 3) camera-space ray per pixel center, scaled to z = -1
+
+    Built from the camera's own view frame, so lens, sensor fit and shift
+    (setup_l515_camera) are exactly what Cycles renders with.
+    """
+    return camera_config.frame_rays(cam_obj.data.view_frame(scene=scene), width, height)
+
+
+class DepthRaycaster:
+    """Depth-only renderer: camera rays against the scene BVH
+
+    The BVH is built once (static scene, moving camera); every frame only
+    casts the rays. Depth is planar camera depth like the Cycles Z pass.
+
+    Cost: BVHTree has no batch query, so a frame is one Python-level
+    ray_cast call per pixel (307,200 at 640x480). Ray setup and the depth /
+    index conversion are NumPy; the per-pixel calls dominate the frame time
+    (see benchmark()). This path saves the render and GPU context, not the
+    per-pixel work, so render_scene.py only uses it (--depth-engine auto) when
+    there is no GPU context for EEVEE to rasterize depth in one pass.
+    """
+
+    def __init__(self, scene, cam_obj, width, height):
+        self.scene, self.cam_obj = scene, cam_obj
+        self.width, self.height = width, height
+        self.tree, self.tri_pass_index = scene_bvh(bpy.context.evaluated_depsgraph_get())
+        self.rays = camera_rays(cam_obj, scene, width, height)
+        self.ray_norm = np.linalg.norm(self.rays, axis=1)
+
+    def render(self, with_index=False, chunk=1 << 14):
+        """(H, W) float32 depth for the current frame
+
+        with_index: also return the (H, W) int32 object pass_index of the
+        hit triangles (0 = background), like Cycles' object index pass
+        chunk: rays converted to Python lists at a time (bounds the list memory)
+        """
+        M = np.array(self.cam_obj.matrix_world)
+        origin = M[:3, 3].tolist()
+        directions = self.rays @ M[:3, :3].T
+        clip_end = self.cam_obj.data.clip_end
+        max_dist = float(clip_end * self.ray_norm.max())
+
+        ray_cast = self.tree.ray_cast
+        dist = np.full(len(directions), np.nan)
+        tri = np.full(len(directions), -1, dtype=np.int64)
+        for start in range(0, len(directions), chunk):
+            for i, d in enumerate(directions[start:start + chunk].tolist(), start):
+                _, _, face, hit = ray_cast(origin, d, max_dist)
+                if hit is not None:
+                    dist[i], tri[i] = hit, face
+
+        # distance along the unit ray -> depth along the camera axis
+        depth = dist / self.ray_norm
+        background = ~(depth <= clip_end)
+        depth[background] = BACKGROUND_DEPTH
+        depth = depth.reshape(self.height, self.width).astype(np.float32)
+        if not with_index:
+            return depth
+        index = np.where(background, 0, self.tri_pass_index[np.maximum(tri, 0)])
+        return depth, index.reshape(self.height, self.width).astype(np.int32)
+
+
+def save_depth_exr(path, depth, scene, fmt):
+    """Write a depth map (or index map) as EXR with the same settings as the compositor output"""
+    height, width = depth.shape
+    image = bpy.data.images.new("depth_raycast", width, height, alpha=True, float_buffer=True)
+    try:
+        pixels = np.ones((height, width, 4), dtype=np.float32)
+        pixels[..., :3] = depth[::-1, :, None]  # Blender images start at the bottom row
+        image.pixels.foreach_set(pixels.ravel())
+
+        settings = scene.render.image_settings
+        saved = (settings.file_format, settings.color_mode, settings.color_depth, settings.exr_codec)
+        settings.file_format = 'OPEN_EXR'
+        settings.color_mode = fmt["color_mode"]
+        settings.color_depth = fmt["color_depth"]
+        settings.exr_codec = fmt["exr_codec"]
+        try:
+            image.save_render(path, scene=scene)
+        finally:
+            (settings.file_format, settings.color_mode, settings.color_depth, settings.exr_codec) = saved
+    finally:
+        bpy.data.images.remove(image)
+
+
+def read_depth_exr(path):
+    """(H, W) float32 depth of an EXR written by the compositor or save_depth_exr"""
+    image = bpy.data.images.load(path, check_existing=False)
+    try:
+        width, height = image.size
+        pixels = np.empty(width * height * image.channels, dtype=np.float32)
+        image.pixels.foreach_get(pixels)
+        depth = pixels.reshape(height, width, image.channels)[::-1, :, 0]
+    finally:
+        bpy.data.images.remove(image)
+    return np.ascontiguousarray(depth)
+
+
+def benchmark(scene, cam_obj, width=640, height=480, frames=5):
+    """BVH build time and ms / frame of DepthRaycaster.render at the current camera pose"""
+    start = time.perf_counter()
+    raycaster = DepthRaycaster(scene, cam_obj, width, height)
+    build = time.perf_counter() - start
+    print(f"[Raycast] BVH of {len(raycaster.tri_pass_index)} triangles: {build * 1000:.0f} ms")
+    start = time.perf_counter()
+    for _ in range(frames):
+        raycaster.render(with_index=True)
+    seconds = (time.perf_counter() - start) / frames
+    print(f"[Raycast] {width}x{height}: {seconds * 1000:.0f} ms/frame, "
+          f"{width * height / seconds / 1e6:.2f} M rays/s")
+
+
+if __name__ == "__main__":
+    # blender -b scene.blend --python depth_raycast.py -- --frames 5
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(description="Benchmark BVH depth ray casting from the scene camera")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--frames", type=int, default=5)
+    args = parser.parse_args(argv)
+    benchmark(bpy.context.scene, bpy.context.scene.camera, args.width, args.height, args.frames)
@@ -0,0 +1,150 @@
+import concurrent.futures
+import os
+import queue
+import sys
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+import preprocess_scene
+
+PipelineStats = namedtuple("PipelineStats", ["frames", "seconds", "fps", "peak_rss_mb"])
+
+_DONE = object()
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process plus its largest finished child (MB)
+
+    None where the `resource` module does not exist (Windows).
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is in bytes on macOS and KiB on Linux
+    unit = 1 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return (own + children) * unit / 2**20
+
+
+def load_frame(frame):
+    """I/O stage: decode depth EXR, RGB PNG and object index EXR of one frame"""
+    meta = preprocess_scene.load_camera_meta(frame.camera_path)
+    img_rgb = preprocess_scene.read_frame_rgb(frame, meta["width"], meta["height"])
+    depth_map = preprocess_scene.read_depth(frame.depth_path, meta["width"], meta["height"])
+    instance_map = preprocess_scene.read_frame_instances(frame, meta["width"], meta["height"])
+    return meta, depth_map, img_rgb, instance_map
+
+
+def backproject_frame(meta, depth_map, img_rgb, instance_map=None, frame_index=0, noise_seed=None,
+                      downsampler=None):
+    """Compute stage, runs in a worker process"""
+    preprocess_scene.add_depth_noise(depth_map, meta, frame_index, noise_seed)
+    backprojector = preprocess_scene.get_backprojector(
+        meta["width"], meta["height"], meta["fx"], meta["fy"], meta["cx"], meta["cy"])
+    points, colors, *labels = backprojector(depth_map, img_rgb, np.array(meta["camera_to_world_4x4"]),
+                                            labels=instance_map)
+    # downsampled here, so only the kept points travel back to the main process
+    points, colors, labels = preprocess_scene.downsample_frame(downsampler, frame_index, points, colors, labels)
+    return (points, colors, *labels)
+
+
+class FramePipeline:
+    """reader threads -> bounded queue -> worker processes -> writer thread
+
+    At most `prefetch` decoded frames wait for a worker and at most
+    `jobs * 2` frames are being computed or written, so memory stays
+    capped regardless of the number of frames. An optional
+    fusion.VoxelFusion and point_store.ShardWriter are fed from the writer
+    thread, in the main process.
+    """
+
+    def __init__(self, out_dir, jobs=None, readers=2, prefetch=8,
+                 encoding="binary_little_endian", fusion=None, noise_seed=None, shards=None,
+                 downsampler=None):
+        self.out_dir = out_dir
+        self.jobs = jobs or os.cpu_count() or 1
+        self.readers = max(1, readers)
+        self.prefetch = max(1, prefetch)
+        self.encoding = encoding
+        self.fusion = fusion
+        self.noise_seed = noise_seed
+        self.shards = shards
+        self.downsampler = downsampler
+
+    def _read(self, frames, lock, loaded):
+        while True:
+            with lock:
+                frame = next(frames, None)
+            if frame is None:
+                break
+            try:
+                loaded.put((frame, load_frame(frame)))
+            except Exception as exc:
+                loaded.put((frame, exc))
+        loaded.put(_DONE)
+
+    def _write(self, pending, in_flight, outputs, errors):
+        while True:
+            item = pending.get()
+            if item is _DONE:
+                break
+            frame, future = item
+            try:
+                points, colors, *labels = future.result()
+                outputs.append(preprocess_scene.store_frame(frame, self.out_dir, points, colors, labels,
+                                                            self.encoding, self.shards))
+                if self.fusion is not None:
+                    self.fusion.add(points, colors)
+            except Exception as exc:
+                errors.append((frame, exc))
+            finally:
+                in_flight.release()
+
+    def run(self, frames):
+        """Convert all frames, returns (output paths, PipelineStats)"""
+        os.makedirs(self.out_dir, exist_ok=True)
+        start = time.perf_counter()
+
+        loaded = queue.Queue(maxsize=self.prefetch)
+        pending = queue.Queue()
+        in_flight = threading.BoundedSemaphore(self.jobs * 2)
+        frame_iter, lock = iter(frames), threading.Lock()
+        outputs, errors = [], []
+
+        readers = [threading.Thread(target=self._read, args=(frame_iter, lock, loaded), daemon=True)
+                   for _ in range(self.readers)]
+        writer = threading.Thread(target=self._write, args=(pending, in_flight, outputs, errors), daemon=True)
+        for t in readers:
+            t.start()
+        writer.start()
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=self.jobs) as pool:
+            finished_readers = 0
+            while finished_readers < len(readers):
+                item = loaded.get()
+                if item is _DONE:
+                    finished_readers += 1
+                    continue
+                frame, data = item
+                if isinstance(data, Exception):
+                    errors.append((frame, data))
+                    continue
+                in_flight.acquire()
+                pending.put((frame, pool.submit(backproject_frame, *data, frame.index, self.noise_seed,
+                                                    self.downsampler)))
+            pending.put(_DONE)
+            writer.join()
+
+        if errors:
+            frame, exc = errors[0]
+            raise RuntimeError(f"{len(errors)} frame(s) failed, first: frame {frame.index}") from exc
+
+        seconds = time.perf_counter() - start
+        stats = PipelineStats(len(outputs), seconds, len(outputs) / seconds if seconds > 0 else 0.0,
+                              peak_rss_mb())
+        return sorted(outputs), stats
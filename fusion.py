@@ -0,0 +1,74 @@
+import numpy as np
+
+# voxel indices are packed into one int64 key, 21 bits per axis
+_KEY_BITS = 21
+_KEY_OFFSET = 1 << (_KEY_BITS - 1)
+_KEY_MASK = (1 << _KEY_BITS) - 1
+
+
+class VoxelFusion:
+    """Streaming multi-view fusion on a sparse voxel grid
+
+    Every frame (world-space points + colors from create_colored_point_cloud)
+    is reduced to its occupied voxels, then merged into a sorted array of
+    voxel keys holding the xyz sum, rgb sum and point count per voxel.
+    Memory grows with the number of occupied voxels, never with the number
+    of points that were added.
+    """
+
+    def __init__(self, voxel_size=0.02):
+        if voxel_size <= 0:
+            raise ValueError("voxel_size must be positive")
+        self.voxel_size = float(voxel_size)
+        self.keys = np.empty(0, dtype=np.int64)
+        self.xyz_sum = np.empty((0, 3), dtype=np.float64)
+        self.rgb_sum = np.empty((0, 3), dtype=np.float64)
+        self.count = np.empty(0, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def voxel_keys(self, points):
+        """(N, 3) world points -> (N,) int64 voxel keys"""
+        idx = np.floor(np.asarray(points) / self.voxel_size).astype(np.int64) + _KEY_OFFSET
+        if idx.size and (idx.min() < 0 or idx.max() > _KEY_MASK):
+            raise ValueError("points are outside the voxel grid range, use a larger voxel_size")
+        return (idx[:, 0] << (2 * _KEY_BITS)) | (idx[:, 1] << _KEY_BITS) | idx[:, 2]
+
+    def add(self, points, colors):
+        """Accumulate one frame"""
+        if len(points) == 0:
+            return
+        keys, inverse = np.unique(self.voxel_keys(points), return_inverse=True)
+        n = len(keys)
+        count = np.bincount(inverse, minlength=n)
+        xyz_sum = np.stack([np.bincount(inverse, weights=points[:, i], minlength=n) for i in range(3)], axis=1)
+        rgb_sum = np.stack([np.bincount(inverse, weights=colors[:, i], minlength=n) for i in range(3)], axis=1)
+        self._merge(keys, xyz_sum, rgb_sum, count)
+
+    def _merge(self, keys, xyz_sum, rgb_sum, count):
+        pos = np.searchsorted(self.keys, keys)
+        hit = pos < len(self.keys)
+        hit[hit] = self.keys[pos[hit]] == keys[hit]
+
+        # voxels seen before: accumulate in place (pos is unique)
+        at = pos[hit]
+        self.xyz_sum[at] += xyz_sum[hit]
+        self.rgb_sum[at] += rgb_sum[hit]
+        self.count[at] += count[hit]
+
+        # new voxels: insert, keys stay sorted
+        new = ~hit
+        if new.any():
+            at = pos[new]
+            self.keys = np.insert(self.keys, at, keys[new])
+            self.xyz_sum = np.insert(self.xyz_sum, at, xyz_sum[new], axis=0)
+            self.rgb_sum = np.insert(self.rgb_sum, at, rgb_sum[new], axis=0)
+            self.count = np.insert(self.count, at, count[new])
+
+    def result(self):
+        """One deduplicated cloud: mean xyz and mean color per voxel"""
+        n = self.count[:, None]
+        points = (self.xyz_sum / n).astype(np.float32)
+        colors = np.rint(self.rgb_sum / n).astype(np.uint8)
+        return points, colors
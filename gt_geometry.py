@@ -0,0 +1,57 @@
+"""Box and visibility math of ground_truth.py
+
+NumPy only: ground_truth.py reads the geometry inside Blender, these
+functions turn it into boxes and per-frame visibility.
+"""
+import numpy as np
+
+import camera_config
+
+
+def yaw_boxes(verts, starts, yaws):
+    """
+    每個物體在自己的 yaw 方向下的最小包圍盒 (不假設 origin 在幾何中心)。
+    verts: (N, 3) 依物體連續排列，starts: (M,) 每個物體第一個頂點，yaws: (M,)
+    returns center (M, 3), size (M, 3) = (沿 heading, 垂直 heading, 高)
+    """
+    counts = np.diff(np.append(starts, len(verts)))
+    c, s = np.cos(yaws), np.sin(yaws)
+    cv, sv = np.repeat(c, counts), np.repeat(s, counts)
+    local = np.column_stack([verts[:, 0] * cv + verts[:, 1] * sv,
+                             -verts[:, 0] * sv + verts[:, 1] * cv,
+                             verts[:, 2]])
+    lo = np.minimum.reduceat(local, starts, axis=0)
+    hi = np.maximum.reduceat(local, starts, axis=0)
+    mid = (lo + hi) / 2
+    center = np.column_stack([mid[:, 0] * c - mid[:, 1] * s, mid[:, 0] * s + mid[:, 1] * c, mid[:, 2]])
+    return center, hi - lo
+
+
+def visibility(points, owner, num_objects, depth, cam2world, intrinsics, tolerance=0.02):
+    """
+    以深度圖估計每個物體的可見比例。
+    物體自己的取樣點先做一次 z-buffer (去掉自我遮擋)，再和深度圖比較：
+    visible pixels / 物體若無遮擋時佔的 pixels。
+    returns in_view (M,) 取樣點在畫面內的比例，pixels (M,)，visibility (M,)
+    """
+    height, width = depth.shape
+    u, v, z = camera_config.project(points, cam2world, *intrinsics)
+    ui, vi = np.floor(u).astype(np.int64, copy=False), np.floor(v).astype(np.int64, copy=False)
+    in_frame = (z > 0) & (ui >= 0) & (ui < width) & (vi >= 0) & (vi < height)
+    in_view = np.bincount(owner[in_frame], minlength=num_objects) / np.maximum(
+        np.bincount(owner, minlength=num_objects), 1)
+
+    # nearest sample of every (object, pixel)
+    key = owner[in_frame] * (height * width) + vi[in_frame] * width + ui[in_frame]
+    zf = z[in_frame]
+    order = np.argsort(key)
+    key, zf = key[order], zf[order]
+    first = np.flatnonzero(np.diff(key, prepend=-1))
+    key, zf = key[first], np.minimum.reduceat(zf, first) if len(first) else zf
+    obj, pix = key // (height * width), key % (height * width)
+
+    # visible if nothing in the depth map is clearly in front of it
+    visible = depth.ravel()[pix] >= zf - tolerance * np.maximum(zf, 1.0)
+    pixels = np.bincount(obj, minlength=num_objects)
+    visible_pixels = np.bincount(obj[visible], minlength=num_objects)
+    return in_view, pixels, visible_pixels / np.maximum(pixels, 1)
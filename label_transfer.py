@@ -0,0 +1,72 @@
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+
+def _same_buffer(a, b):
+    """True when a and b are views of exactly the same data"""
+    if a is b:
+        return True
+    a, b = np.asarray(a), np.asarray(b)
+    return (a.shape == b.shape and a.dtype == b.dtype and a.strides == b.strides
+            and a.__array_interface__["data"][0] == b.__array_interface__["data"][0])
+
+
+class LabelTransfer:
+    """Nearest-vertex label transfer with a cache of KD-trees
+
+    One cKDTree is built per vertex set and kept in an LRU cache of
+    `max_trees` entries, so painting many frames against the same mesh
+    only builds the tree once.
+
+    key: "identity" keys the cache on the vertex array object (the array is
+         kept alive while cached, so its id cannot be reused);
+         "hash" keys it on the array contents, for callers that reload the
+         same vertices into new arrays.
+    """
+
+    def __init__(self, max_trees=4, key="identity", workers=-1):
+        if key not in ("identity", "hash"):
+            raise ValueError(f"Unknown cache key '{key}', expected 'identity' or 'hash'")
+        self.max_trees = max_trees
+        self.key = key
+        self.workers = workers
+        self._trees = OrderedDict()
+
+    def _cache_key(self, vertices):
+        if self.key == "hash":
+            data = np.ascontiguousarray(vertices)
+            digest = hashlib.blake2b(data.view(np.uint8), digest_size=16).hexdigest()
+            return (digest, data.shape, data.dtype.str)
+        return (id(vertices), vertices.shape, vertices.__array_interface__["data"][0])
+
+    def tree(self, vertices):
+        key = self._cache_key(vertices)
+        entry = self._trees.get(key)
+        if entry is not None:
+            self._trees.move_to_end(key)
+            return entry[1]
+
+        tree = cKDTree(vertices)
+        self._trees[key] = (vertices, tree)
+        while len(self._trees) > self.max_trees:
+            self._trees.popitem(last=False)
+        return tree
+
+    def nearest(self, points, vertices):
+        """(N,) index of the nearest vertex for every point"""
+        if _same_buffer(points, vertices):
+            return np.arange(len(vertices))
+        _, indices = self.tree(vertices).query(points, k=1, workers=self.workers)
+        return indices
+
+    def transfer(self, points, vertices, labels):
+        """labels defined on vertices -> labels on points"""
+        if _same_buffer(points, vertices):
+            return np.asarray(labels)
+        return np.asarray(labels)[self.nearest(points, vertices)]
+
+    def clear(self):
+        self._trees.clear()
@@ -1,13 +1,19 @@
+import os
+import sys
+
 import bpy
-import numpy as np
 
+# Blender 執行時 sys.path 不含腳本目錄
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.append(SCRIPT_DIR)
+import layout_engine
+
+ROOM_SPEC = os.path.join(SCRIPT_DIR, "rooms", "cvrlab.json")
+LAYOUT_FILE = None  # layout_engine.py 產生的 JSON；None = 在這裡用 LAYOUT_SEED 取樣
+LAYOUT_SEED = 0
+LAYOUT_COUNTS = {"chair": 8, "table": 8, "double_door_cabinet": 1, "storage_cabinet": 1, "bookshelf": 1}
 
-def add_texture_node(nodes, path, colorspace='sRGB'):
-    tex_node = nodes.new("ShaderNodeTexImage")
-    img = bpy.data.images.load(path)
-    tex_node.image = img
-    tex_node.image.colorspace_settings.name = colorspace
-    return tex_node
 
 def transformation(obj, location=None, scale=None, rotation_euler=None):
     if scale:
@@ -18,120 +24,65 @@ def transformation(obj, location=None, scale=None, rotation_euler=None):
         obj.location = location
 
 
-# ====== Build table and chair ======
-obj = bpy.context.scene.objects["chair"]
-dim = obj.dimensions
-transformation(
-    obj,
-    location=(0, 2.2, dim.z/2),
-    rotation_euler=(0, 0, np.deg2rad(180))
-)
-obj = bpy.context.scene.objects["chair_copy1"]
-dim = obj.dimensions
-transformation(
-    obj,
-    location=(0-1.5, 2.2, dim.z/2)
-)
+def catalog_from_scene(catalog=layout_engine.CATALOG):
+    """用場景中模型的實際尺寸取代 catalog 的預設尺寸，找不到的模型略過"""
+    scene_catalog = {}
+    for item, entry in catalog.items():
+        obj = bpy.data.objects.get(entry["object"])
+        if obj is None:
+            print(f"Warning: '{entry['object']}' not in the scene, skipping '{item}'.")
+            continue
+        dim = obj.dimensions
+        scene_catalog[item] = dict(entry, size=(dim.x, dim.y, dim.z))
+    return scene_catalog
+
+
+def instance_object(src, name):
+    """<src>_copyN：已存在就重用，否則建立共用 mesh 資料的新物件"""
+    obj = bpy.data.objects.get(name)
+    if obj is None:
+        obj = src.copy()
+        obj.data = src.data  # 鏈接數據塊，而非複製
+        obj.animation_data_clear()
+        obj.name = name
+        (src.users_collection[0] if src.users_collection else bpy.context.collection).objects.link(obj)
+    return obj
 
-obj = bpy.context.scene.objects["chair_copy2"]
-dim = obj.dimensions
-transformation(
-    obj,
-    location=(0, 1.1, dim.z/2),
-    rotation_euler=(0, 0, np.deg2rad(0))
-)
 
-obj = bpy.context.scene.objects["chair_copy3"]
-dim = obj.dimensions
-transformation(
-    obj,
-    location=(0-1.5, 1.1, dim.z/2),
-    rotation_euler=(0, 0, np.deg2rad(0))
-)
-obj = bpy.context.scene.objects["chair_copy4"]
-dim = obj.dimensions
-transformation(
-    obj,
-    location=(-3.5, 1.1, dim.z/2),
-    rotation_euler=(0, 0, np.deg2rad(0))
-)
-obj = bpy.context.scene.objects["chair_copy5"]
-dim = obj.dimensions
-transformation(
-    obj,
-    location=(-3.5-1.5, 1.1, dim.z/2),
-    rotation_euler=(0, 0, np.deg2rad(0))
-)
-obj = bpy.context.scene.objects["chair_copy6"]
-dim = obj.dimensions
-transformation(
-    obj,
-    location=(-3.5, 2.2, dim.z/2),
-    rotation_euler=(0, 0, np.deg2rad(180))
-)
-obj = bpy.context.scene.objects["chair_copy7"]
-dim = obj.dimensions
-transformation(
-    obj,
-    location=(-3.5-1.5, 2.2, dim.z/2),
-    rotation_euler=(0, 0, np.deg2rad(180))
-)
+def apply_layout(placements, catalog):
+    """把 layout_engine 的 placements 套用到場景，多出來的舊副本隱藏"""
+    used = {}
+    for p in placements:
+        if p.name not in catalog:
+            continue
+        src = bpy.data.objects[catalog[p.name]["object"]]
+        n = used.get(src.name, 0)
+        used[src.name] = n + 1
+        obj = src if n == 0 else instance_object(src, f"{src.name}_copy{n}")
+        obj.hide_render = obj.hide_viewport = False
+        transformation(
+            obj,
+            location=(p.x, p.y, obj.dimensions.z/2),
+            rotation_euler=(0, 0, p.yaw + catalog[p.name].get("yaw_offset", 0.0))
+        )
 
+    for entry in catalog.values():
+        name, n = entry["object"], used.get(entry["object"], 0)
+        stale = [bpy.data.objects[name]] if n == 0 else []
+        k = max(n, 1)
+        while bpy.data.objects.get(f"{name}_copy{k}") is not None:
+            stale.append(bpy.data.objects[f"{name}_copy{k}"])
+            k += 1
+        for obj in stale:
+            obj.hide_render = obj.hide_viewport = True
 
-obj = bpy.context.scene.objects["table"]
-dim = obj.dimensions
-transformation(
-    obj,
-    location=(0, 2, dim.z/2),
-    rotation_euler=(0, 0, np.deg2rad(90))
-)
 
-obj = bpy.context.scene.objects["table_copy1"]
-dim = obj.dimensions
-transformation(
-    obj,
-    location=(0-2*dim.x-0.05, 2, dim.z/2),
-    rotation_euler=(0, 0, np.deg2rad(90))
-)
-obj = bpy.context.scene.objects["table_copy2"]
-dim = obj.dimensions
-transformation(
-    obj,
-    location=(0, 2-1/2*dim.y+0.05, dim.z/2),
-    rotation_euler=(0, 0, np.deg2rad(-90))
-)
-obj = bpy.context.scene.objects["table_copy3"]
-dim = obj.dimensions
-transformation(
-    obj,
-    location=(0-2*dim.x-0.05, 2-1/2*dim.y+0.05, dim.z/2),
-    rotation_euler=(0, 0, np.deg2rad(-90))
-)
-obj = bpy.context.scene.objects["table_copy4"]
-dim = obj.dimensions
-transformation(
-    obj,
-    location=(-3.5, 2, dim.z/2),
-    rotation_euler=(0, 0, np.deg2rad(90))
-)
-obj = bpy.context.scene.objects["table_copy5"]
-dim = obj.dimensions
-transformation(
-    obj,
-    location=(-3.5, 2-1/2*dim.y+0.05, dim.z/2),
-    rotation_euler=(0, 0, np.deg2rad(90))
-)
-obj = bpy.context.scene.objects["table_copy6"]
-dim = obj.dimensions
-transformation(
-    obj,
-    location=(-3.5-2*dim.x-0.05, 2-1/2*dim.y+0.05, dim.z/2),
-    rotation_euler=(0, 0, np.deg2rad(-90))
-)
-obj = bpy.context.scene.objects["table_copy7"]
-dim = obj.dimensions
-transformation(
-    obj,
-    location=(-3.5-2*dim.x-0.05, 2, dim.z/2),
-    rotation_euler=(0, 0, np.deg2rad(90))
-)
\ No newline at end of file
+# ====== Layout ======
+catalog = catalog_from_scene()
+if LAYOUT_FILE:
+    placements = layout_engine.load_layout(LAYOUT_FILE)
+else:
+    sampler = layout_engine.LayoutSampler(layout_engine.load_room(ROOM_SPEC), catalog, seed=LAYOUT_SEED)
+    placements = sampler.sample({item: n for item, n in LAYOUT_COUNTS.items() if item in catalog})
+apply_layout(placements, catalog)
+print(f"[Layout] {len(placements)} objects placed")
@@ -0,0 +1,82 @@
+import hashlib
+import json
+import os
+
+import bpy
+
+# custom property that tags a material with the hash of the parameters it was built from
+HASH_PROP = "param_hash"
+
+# (absolute path, colorspace) -> image name, material hash -> material name
+_images = {}
+_materials = {}
+
+
+def image_key(path, colorspace='sRGB'):
+    return os.path.normcase(os.path.abspath(bpy.path.abspath(path))), colorspace
+
+
+def load_image(path, colorspace='sRGB'):
+    """
+    每個 (絕對路徑, colorspace) 只載入一次圖片。
+    同一張圖若已用其他 colorspace 載入且被使用中，另外載入一份，不改到別人的設定。
+    """
+    key = image_key(path, colorspace)
+    img = bpy.data.images.get(_images.get(key, ""))
+    if img is not None and image_key(img.filepath, img.colorspace_settings.name) == key:
+        return img
+
+    img = bpy.data.images.load(path, check_existing=True)
+    if img.users > 0 and img.colorspace_settings.name != colorspace:
+        img = bpy.data.images.load(path, check_existing=False)
+    img.colorspace_settings.name = colorspace
+    _images[key] = img.name
+    return img
+
+
+def material_hash(**params):
+    """Stable hash of a material parameter set (texture paths are made absolute)"""
+    normalized = {k: image_key(v)[0] if k.endswith("_path") and v else v for k, v in params.items()}
+    return hashlib.sha1(json.dumps(normalized, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def find_material(param_hash):
+    """Material built earlier from the same parameters, or None"""
+    mat = bpy.data.materials.get(_materials.get(param_hash, ""))
+    if mat is not None and mat.get(HASH_PROP) == param_hash:
+        return mat
+    # module state is lost when Blender reloads the script, the tag on the datablock is not
+    for mat in bpy.data.materials:
+        if mat.get(HASH_PROP) == param_hash:
+            _materials[param_hash] = mat.name
+            return mat
+    return None
+
+
+def register_material(mat, param_hash):
+    mat[HASH_PROP] = param_hash
+    _materials[param_hash] = mat.name
+    return mat
+
+
+def image_memory():
+    """(number of images in use, approximate bytes of their pixel buffers)
+
+    Reading img.size loads the buffer, which the render does anyway.
+    """
+    count, total = 0, 0
+    for img in bpy.data.images:
+        if img.users == 0:
+            continue
+        width, height = img.size
+        bytes_per_channel = 4 if img.is_float else 1
+        count += 1
+        total += width * height * img.channels * bytes_per_channel
+    return count, total
+
+
+def report():
+    count, total = image_memory()
+    print(f"[Images] {count} in use, {total / 2**20:.1f} MB | "
+          f"{len(bpy.data.images)} image / {len(bpy.data.materials)} material datablocks")
+    return count, total
@@ -0,0 +1,323 @@
+"""Memory-mapped point store: many samples packed into a few large files
+
+A store directory holds dataset.json and shard_00000/, shard_00001/, ...
+Every shard stores its samples back to back, one flat file per array:
+
+    xyz.bin         float32 (N, 3)   points
+    rgb.bin         uint8   (N, 3)   or float32 (pack_store, the colors of points/*.bin as they are)
+    <label>.bin     int64   (N,)     one per label field, e.g. instance / semantic / superpoint
+    boxes.bin       float32 (M, 7)   cx, cy, cz, dx, dy, dz, heading (ground_truth.py boxes)
+    box_labels.bin  int64   (M,)     class id
+    index.npz       names, point_offsets (S + 1,), box_offsets (S + 1,)
+
+dataset.json holds the label fields, the shard sizes and one class list for
+the whole store: "semantic" labels and box labels are both indices into
+"classes" (0 = background, -1 = unlabeled), whatever class map the scene of
+a sample used, and "rgb_dtype" of rgb.bin. A shard is closed once it holds shard_points points, so the
+number of files grows with the data volume instead of with the frames.
+
+pack_store / export_store convert from / to the points/*.bin (N, 6) +
+superpoints/*.bin layout of visualizer.py.
+"""
+import argparse
+import glob
+import json
+import os
+
+import numpy as np
+
+DATASET_FILE = "dataset.json"
+INDEX_FILE = "index.npz"
+BOX_DIM = 7
+POINT_DIM = 6  # x, y, z, r, g, b (float32), same as points/*.bin
+SEMANTIC = "semantic"  # label field holding class ids
+UNLABELED = -1
+
+
+def _point_arrays(labels, rgb_dtype=np.uint8):
+    """file name -> (dtype, columns) of the per-point arrays"""
+    arrays = {"xyz": (np.float32, 3), "rgb": (np.dtype(rgb_dtype), 3)}
+    arrays.update({label: (np.int64, 1) for label in labels})
+    return arrays
+
+
+BOX_ARRAYS = {"boxes": (np.float32, BOX_DIM), "box_labels": (np.int64, 1)}
+
+
+class ShardWriter:
+    """Appends samples to fixed-size shards
+
+    with ShardWriter("dataset", labels=("instance", "semantic")) as writer:
+        writer.add("0001", xyz, rgb, {"instance": ids, "semantic": classes}, boxes, box_classes, class_map)
+
+    Label fields missing from a sample are written as -1. Class ids are
+    remapped to the store's class list on add: per-point "semantic" ids
+    through the sample's class_map {class name: id}, boxes by class name.
+    rgb_dtype: uint8 (0..255) or float32 (stored as given, no range assumed).
+    """
+
+    def __init__(self, root, labels=("instance", "semantic"), shard_points=1 << 24, classes=("background",),
+                 rgb_dtype=np.uint8):
+        self.root = root
+        self.labels = tuple(labels)
+        self.rgb_dtype = np.dtype(rgb_dtype)
+        if self.rgb_dtype not in (np.uint8, np.float32):
+            raise ValueError(f"rgb_dtype must be uint8 or float32, got {self.rgb_dtype}")
+        self.shard_points = shard_points
+        self.classes = list(classes)
+        self.shards = []
+        self._files = None
+        os.makedirs(root, exist_ok=True)
+        if glob.glob(os.path.join(root, "shard_*")):
+            raise FileExistsError(f"{root} already contains shards")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def class_id(self, name):
+        """Class name -> store-wide id, new names are appended to the class list"""
+        if name not in self.classes:
+            self.classes.append(name)
+        return self.classes.index(name)
+
+    def remap_classes(self, ids, class_map):
+        """Per-point class ids of a sample's class_map -> store-wide ids, unknown ids -> UNLABELED"""
+        ids = np.asarray(ids, dtype=np.int64)
+        local = {int(i): name for name, i in class_map.items()}
+        lut = np.full(max(local, default=0) + 2, UNLABELED, dtype=np.int64)
+        for i, name in local.items():
+            lut[i] = self.class_id(name)
+        # negative ids clip to -1, i.e. the last (UNLABELED) entry
+        return lut[np.clip(ids, -1, len(lut) - 1)]
+
+    def _open_shard(self):
+        name = f"shard_{len(self.shards):05d}"
+        os.makedirs(os.path.join(self.root, name))
+        arrays = list(_point_arrays(self.labels, self.rgb_dtype)) + list(BOX_ARRAYS)
+        self._files = {key: open(os.path.join(self.root, name, key + ".bin"), "wb") for key in arrays}
+        self._name = name
+        self._names, self._point_offsets, self._box_offsets = [], [0], [0]
+
+    def _close_shard(self):
+        for f in self._files.values():
+            f.close()
+        self._files = None
+        np.savez(os.path.join(self.root, self._name, INDEX_FILE),
+                 names=np.array(self._names),
+                 point_offsets=np.array(self._point_offsets, dtype=np.int64),
+                 box_offsets=np.array(self._box_offsets, dtype=np.int64))
+        self.shards.append({"name": self._name, "samples": len(self._names),
+                            "points": self._point_offsets[-1], "boxes": self._box_offsets[-1]})
+
+    def add(self, name, xyz, rgb, labels=None, boxes=None, box_classes=None, class_map=None):
+        """box_classes: class name per box; class_map: {class name: id} of labels["semantic"]"""
+        n = len(xyz)
+        labels = labels or {}
+        unknown = set(labels) - set(self.labels)
+        if unknown:
+            raise ValueError(f"Label fields {sorted(unknown)} not in the writer's fields {self.labels}")
+        if labels.get(SEMANTIC) is not None:
+            if class_map is None:
+                raise ValueError(f"'{SEMANTIC}' labels of sample {name} need the class_map they index")
+            labels = dict(labels, **{SEMANTIC: self.remap_classes(labels[SEMANTIC], class_map)})
+
+        if self._files is not None and self._point_offsets[-1] and self._point_offsets[-1] + n > self.shard_points:
+            self._close_shard()
+        if self._files is None:
+            self._open_shard()
+
+        f = self._files
+        np.ascontiguousarray(xyz, dtype=np.float32).reshape(n, 3).tofile(f["xyz"])
+        np.ascontiguousarray(rgb, dtype=self.rgb_dtype).reshape(n, 3).tofile(f["rgb"])
+        for label in self.labels:
+            values = labels.get(label)
+            values = np.full(n, -1, dtype=np.int64) if values is None else np.asarray(values, dtype=np.int64)
+            if len(values) != n:
+                raise ValueError(f"'{label}' of sample {name} has {len(values)} values for {n} points")
+            values.tofile(f[label])
+
+        m = 0 if boxes is None else len(boxes)
+        if m:
+            np.ascontiguousarray(boxes, dtype=np.float32).reshape(m, BOX_DIM).tofile(f["boxes"])
+            np.array([self.class_id(c) for c in box_classes], dtype=np.int64).tofile(f["box_labels"])
+
+        self._names.append(str(name))
+        self._point_offsets.append(self._point_offsets[-1] + n)
+        self._box_offsets.append(self._box_offsets[-1] + m)
+
+    def close(self):
+        if self._files is not None:
+            self._close_shard()
+        with open(os.path.join(self.root, DATASET_FILE), "w", encoding="utf-8") as f:
+            json.dump({"labels": list(self.labels), "classes": self.classes, "rgb_dtype": self.rgb_dtype.name,
+                       "shards": self.shards}, f, indent=2)
+
+
+def gt_boxes(gt_json):
+    """(M, 7) boxes + M class names of a ground_truth.py gt_####.json"""
+    with open(gt_json, "r", encoding="utf-8") as f:
+        objects = json.load(f)["objects"]
+    boxes = np.array([obj["center"] + obj["size"] + [obj["heading"]] for obj in objects],
+                     dtype=np.float32).reshape(-1, BOX_DIM)
+    return boxes, [obj["class"] for obj in objects]
+
+
+def _memmap(path, dtype, shape):
+    if shape[0] == 0:
+        return np.empty(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=shape)
+
+
+def _read(path, dtype, shape):
+    """Whole array in one sequential read"""
+    return np.fromfile(path, dtype=dtype, count=int(np.prod(shape))).reshape(shape)
+
+
+class PointStore:
+    """Reader of a ShardWriter / pack_store directory
+
+    store[i] / store.sample(i) returns a dict of read-only memory-mapped
+    views (only the pages of sample i are read); stream() walks all samples
+    in order and loads each shard with one read per array.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        with open(os.path.join(root, DATASET_FILE), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.labels = meta["labels"]
+        self.classes = meta["classes"]
+        self.shards = meta["shards"]
+        self.rgb_dtype = np.dtype(meta.get("rgb_dtype", "uint8"))
+        self.point_arrays = _point_arrays(self.labels, self.rgb_dtype)
+
+        self.names, self._index = [], []
+        for shard in self.shards:
+            with np.load(os.path.join(root, shard["name"], INDEX_FILE)) as index:
+                self._index.append((index["point_offsets"], index["box_offsets"]))
+                self.names += index["names"].tolist()
+        self.shard_starts = np.cumsum([0] + [shard["samples"] for shard in self.shards])
+        self._lookup = {name: i for i, name in enumerate(self.names)}
+        self._maps = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, i):
+        return self.sample(i)
+
+    def index_of(self, name):
+        return self._lookup[name]
+
+    def _shape(self, s, key, columns):
+        rows = self.shards[s]["boxes" if key in BOX_ARRAYS else "points"]
+        return (rows, columns) if columns > 1 else (rows,)
+
+    def _arrays(self, s, load):
+        """{array name: whole array of shard s}"""
+        shard_dir = os.path.join(self.root, self.shards[s]["name"])
+        return {key: load(os.path.join(shard_dir, key + ".bin"), dtype, self._shape(s, key, columns))
+                for key, (dtype, columns) in {**self.point_arrays, **BOX_ARRAYS}.items()}
+
+    def _slice(self, s, local, arrays):
+        point_offsets, box_offsets = self._index[s]
+        p0, p1 = point_offsets[local], point_offsets[local + 1]
+        b0, b1 = box_offsets[local], box_offsets[local + 1]
+        sample = {"name": self.names[self.shard_starts[s] + local]}
+        for key, array in arrays.items():
+            sample[key] = array[b0:b1] if key in BOX_ARRAYS else array[p0:p1]
+        return sample
+
+    def sample(self, i):
+        if not 0 <= i < len(self):
+            raise IndexError(f"sample {i} out of range for {len(self)} samples")
+        s = int(np.searchsorted(self.shard_starts, i, side="right")) - 1
+        if s not in self._maps:
+            self._maps[s] = self._arrays(s, _memmap)
+        return self._slice(s, i - self.shard_starts[s], self._maps[s])
+
+    def stream(self):
+        """All samples in storage order, one shard in memory at a time"""
+        for s, shard in enumerate(self.shards):
+            arrays = self._arrays(s, _read)
+            for local in range(shard["samples"]):
+                yield self._slice(s, local, arrays)
+
+    def __iter__(self):
+        return self.stream()
+
+    def xyz(self, i):
+        """(N, 3) float32 view of sample i"""
+        return self.sample(i)["xyz"]
+
+    def rgb(self, i):
+        """(N, 3) float32 colors of sample i: a view of float32 stores, uint8 stores scaled to 0..1"""
+        rgb = self.sample(i)["rgb"]
+        return rgb if self.rgb_dtype == np.float32 else rgb * np.float32(1 / 255)
+
+    def superpoints(self, i):
+        return self.sample(i)["superpoint"]
+
+
+def pack_store(src_root, dst_dir, shard_points=1 << 24):
+    """points/*.bin (+ superpoints/*.bin) -> store with a superpoint label (-1 where a file is missing)
+
+    Colors are kept as float32, bit for bit, whatever their range.
+    """
+    point_files = sorted(glob.glob(os.path.join(src_root, "points", "*.bin")))
+    if not point_files:
+        raise FileNotFoundError(f"No points/*.bin under {src_root}")
+    with ShardWriter(dst_dir, labels=("superpoint",), shard_points=shard_points, rgb_dtype=np.float32) as writer:
+        for pc_file in point_files:
+            name = os.path.splitext(os.path.basename(pc_file))[0]
+            nbytes = os.path.getsize(pc_file)
+            if nbytes % (POINT_DIM * 4):
+                raise ValueError(f"'{pc_file}' is not a (N, {POINT_DIM}) float32 file")
+            points = np.fromfile(pc_file, dtype=np.float32).reshape(-1, POINT_DIM)
+            sp_file = os.path.join(src_root, "superpoints", name + ".bin")
+            labels = {"superpoint": np.fromfile(sp_file, dtype=np.int64)} if os.path.exists(sp_file) else None
+            writer.add(name, points[:, :3], points[:, 3:6], labels)
+    return len(point_files)
+
+
+def export_store(store, dst_root, label="superpoint"):
+    """Store -> points/<name>.bin (N, 6) float32 (+ superpoints/<name>.bin from `label`)"""
+    os.makedirs(os.path.join(dst_root, "points"), exist_ok=True)
+    with_label = label in store.labels
+    if with_label:
+        os.makedirs(os.path.join(dst_root, "superpoints"), exist_ok=True)
+    for sample in store.stream():
+        points = np.empty((len(sample["xyz"]), POINT_DIM), dtype=np.float32)
+        points[:, :3] = sample["xyz"]
+        if store.rgb_dtype == np.float32:
+            points[:, 3:6] = sample["rgb"]
+        else:
+            np.multiply(sample["rgb"], np.float32(1 / 255), out=points[:, 3:6])
+        points.tofile(os.path.join(dst_root, "points", sample["name"] + ".bin"))
+        if with_label:
+            sample[label].tofile(os.path.join(dst_root, "superpoints", sample["name"] + ".bin"))
+    return len(store)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert between point stores and points/ + superpoints/ *.bin files")
+    sub = parser.add_subparsers(dest="command", required=True)
+    pack = sub.add_parser("pack", help="points/ + superpoints/ *.bin -> store")
+    pack.add_argument("src_root", help="directory containing points/ and superpoints/")
+    pack.add_argument("dst_dir", help="output store directory")
+    pack.add_argument("--shard-points", type=int, default=1 << 24)
+    export = sub.add_parser("export", help="store -> points/ + superpoints/ *.bin")
+    export.add_argument("src_dir")
+    export.add_argument("dst_root")
+    export.add_argument("--label", default="superpoint", help="label field written to superpoints/")
+    args = parser.parse_args()
+
+    if args.command == "pack":
+        n = pack_store(args.src_root, args.dst_dir, args.shard_points)
+        print(f"[DONE] packed {n} samples -> {args.dst_dir}")
+    else:
+        n = export_store(PointStore(args.src_dir), args.dst_root, args.label)
+        print(f"[DONE] exported {n} samples -> {args.dst_root}")
@@ -1,97 +1,483 @@
+import argparse
+import functools
+import glob
 import json, os
+import re
+import tempfile
+import time
+from collections import namedtuple
 import numpy as np
-import OpenEXR, Imath
 import cv2
 
+import depth_io
+import depth_noise
+import downsample
+import point_store
+
 # Path
-IN_DIR = r"tmp\blender_output" 
-OUT_DIR = r"tmp\scene_output"
-depth_exr = os.path.join(IN_DIR, "depth_0001.exr")
-rgb_png   = os.path.join(IN_DIR, "rgb_0001.png")
-cam_json  = os.path.join(IN_DIR, "camera.json")
-
-# Camera intrinsics / extrinsics
-with open(cam_json, "r") as f:
-    meta = json.load(f)
-
-W, H = meta["width"], meta["height"]
-fx, fy, cx, cy = meta["fx"], meta["fy"], meta["cx"], meta["cy"]
-cam2world = np.array(meta["camera_to_world_4x4"])
-
-# RGB
-img_rgb = cv2.imread(rgb_png)
-img_rgb = cv2.cvtColor(img_rgb, cv2.COLOR_BGR2RGB)
-
-# Read Depth information EXR
-exr = OpenEXR.InputFile(depth_exr)
-dw = exr.header()['dataWindow']
-size = (dw.max.x - dw.min.x + 1, dw.max.y - dw.min.y + 1)
-assert size == (W, H), "depth map size error"
-
-pt = Imath.PixelType(Imath.PixelType.FLOAT)
-depth_channel_str = exr.channel('R', pt)
-depth_map = np.frombuffer(depth_channel_str, dtype=np.float32)
-depth_map = depth_map.reshape(H, W)
-exr.close()
+IN_DIR = os.path.join("tmp", "blender_output")
+OUT_DIR = os.path.join("tmp", "scene_output")
+
+DEPTH_PATTERN = re.compile(r"depth_(\d+)\.exr$")
+UNLABELED = point_store.UNLABELED  # semantic id of instance ids missing from the camera json class map
+
+# one rendered frame: rgb_####.png + depth_####.exr + its camera metadata
+# rgb_path is None for depth-only renders (render_scene.py --depth-only)
+# index_path is the object index pass index_####.exr, gt_path the gt_####.json boxes, None if not rendered
+Frame = namedtuple("Frame", ["index", "rgb_path", "depth_path", "camera_path", "index_path", "gt_path"],
+                   defaults=(None, None))
+
+
+def discover_frames(in_dir):
+    """找出 in_dir 中所有 depth_####.exr 及對應的 rgb_####.png
+
+    每幀的相機參數優先使用 camera_####.json，否則共用 camera.json
+    A frame without rgb_####.png is kept as depth-only (rgb_path None).
+    A render_farm index.json in in_dir lists the frames of all shards instead.
+    """
+    index_path = os.path.join(in_dir, "index.json")
+    if os.path.exists(index_path):
+        with open(index_path, "r") as f:
+            index = json.load(f)
+        return [Frame(entry["frame"],
+                      os.path.join(in_dir, entry["rgb"]) if entry.get("rgb") else None,
+                      os.path.join(in_dir, entry["depth"]),
+                      os.path.join(in_dir, entry["camera"]),
+                      os.path.join(in_dir, entry["index"]) if entry.get("index") else None,
+                      os.path.join(in_dir, entry["gt"]) if entry.get("gt") else None)
+                for entry in index["frames"]]
+
+    shared_camera = os.path.join(in_dir, "camera.json")
+    frames = []
+    for depth_path in sorted(glob.glob(os.path.join(in_dir, "depth_*.exr"))):
+        match = DEPTH_PATTERN.search(os.path.basename(depth_path))
+        if match is None:
+            continue
+        tag = match.group(1)
+        rgb_path = os.path.join(in_dir, f"rgb_{tag}.png")
+        if not os.path.exists(rgb_path):
+            rgb_path = None
+        camera_path = os.path.join(in_dir, f"camera_{tag}.json")
+        if not os.path.exists(camera_path):
+            camera_path = shared_camera
+        if not os.path.exists(camera_path):
+            raise FileNotFoundError(f"No camera metadata for frame {tag} in {in_dir}")
+        index_path = os.path.join(in_dir, f"index_{tag}.exr")
+        if not os.path.exists(index_path):
+            index_path = None
+        gt_path = os.path.join(in_dir, f"gt_{tag}.json")
+        if not os.path.exists(gt_path):
+            gt_path = None
+        frames.append(Frame(int(tag), rgb_path, depth_path, camera_path, index_path, gt_path))
+    return frames
+
+
+@functools.lru_cache(maxsize=None)
+def _load_camera_meta(cam_json):
+    with open(cam_json, "r") as f:
+        return json.load(f)
+
+
+def load_camera_meta(cam_json):
+    """Camera intrinsics / extrinsics; shared camera.json is only parsed once"""
+    return _load_camera_meta(os.path.abspath(cam_json))
+
+
+def read_frame_rgb(frame, width, height):
+    """RGB of a frame, a flat gray image for depth-only frames"""
+    if frame.rgb_path is None:
+        return np.full((height, width, 3), 128, dtype=np.uint8)
+    return read_rgb(frame.rgb_path)
+
+
+def read_rgb(rgb_png):
+    img_rgb = cv2.imread(rgb_png)
+    if img_rgb is None:
+        raise FileNotFoundError(f"Could not read image '{rgb_png}'")
+    return cv2.cvtColor(img_rgb, cv2.COLOR_BGR2RGB)
+
+
+@functools.lru_cache(maxsize=None)
+def get_depth_reader(width, height):
+    """DepthReader (and its buffer) shared by the frames of this process"""
+    return depth_io.DepthReader(width, height)
+
+
+def read_depth(depth_exr, width, height, reuse_buffer=False):
+    """Read Depth information EXR
+
+    reuse_buffer: decode into the shared per-size buffer, which the next
+    call overwrites; otherwise a new array is returned.
+    """
+    reader = get_depth_reader(width, height)
+    out = None if reuse_buffer else np.empty((height, width), dtype=reader.dtype)
+    return reader.read(depth_exr, out)
+
+
+def read_instances(index_exr, width, height):
+    """Object index pass -> (H, W) int32 instance ids (pass_index, 0 = background)"""
+    # own buffer: the shared one may hold this frame's depth (read_depth reuse_buffer)
+    index_map = get_depth_reader(width, height).read(index_exr, np.empty((height, width), dtype=np.float32))
+    return np.rint(index_map).astype(np.int32)
+
+
+def read_frame_instances(frame, width, height):
+    return None if frame.index_path is None else read_instances(frame.index_path, width, height)
+
+
+@functools.lru_cache(maxsize=None)
+def _semantic_lut(cam_json):
+    """class id per instance id, 0 -> background, ids missing from the map -> UNLABELED
+
+    One extra UNLABELED entry at the end catches ids above the map after clipping.
+    """
+    instances = _load_camera_meta(cam_json)["segmentation"]["instances"]
+    lut = np.full(max(map(int, instances), default=0) + 2, UNLABELED, dtype=np.int32)
+    lut[0] = 0
+    for instance_id, entry in instances.items():
+        lut[int(instance_id)] = entry["class_id"]
+    return lut
+
+
+def semantic_labels(instances, cam_json):
+    """instance id -> class id through the class map of the camera json (0 = background, -1 = unlabeled)"""
+    lut = _semantic_lut(os.path.abspath(cam_json))
+    # negative ids clip to -1, i.e. the last (UNLABELED) entry
+    return lut[np.clip(instances, -1, len(lut) - 1)]
+
+
+class Backprojector:
+    """深度圖反投影：同一組內參 (W, H, fx, fy, cx, cy) 只建立一次像素射線
+
+    rays: (H*W, 3) float32, 相機座標 (Blender: 前方 -Z, 上方 +Y), z = -1
+    """
+
+    def __init__(self, width, height, fx, fy, cx, cy):
+        self.key = (width, height, fx, fy, cx, cy)
+        self.width, self.height = width, height
+
+        x = (np.arange(width, dtype=np.float32) - cx) / fx
+        y = -(np.arange(height, dtype=np.float32) - cy) / fy
+        rays = np.empty((height, width, 3), dtype=np.float32)
+        rays[..., 0] = x[None, :]
+        rays[..., 1] = y[:, None]
+        rays[..., 2] = -1.0
+        self.rays = rays.reshape(-1, 3)
+
+    def valid_indices(self, depth_map, min_depth=0, max_depth=100):
+        """flat indices of the pixels with a usable depth"""
+        valid = (depth_map > min_depth) & (depth_map < max_depth)
+        return np.flatnonzero(valid)
+
+    def __call__(self, depth_map, image_rgb, cam2world, min_depth=0, max_depth=100, labels=None):
+        """returns points, colors (and labels, gathered with the same mask, if a label map is given)"""
+        assert depth_map.shape == (self.height, self.width), "depth map size error"
+        idx = self.valid_indices(depth_map, min_depth, max_depth)
+
+        # np.take on the row axis is much faster than fancy indexing here
+        Z = depth_map.reshape(-1)[idx].astype(np.float32, copy=False)
+        points_camera = np.take(self.rays, idx, axis=0)
+        points_camera *= Z[:, None]
+
+        # camera -> world: rotation + translation, no homogeneous row
+        cam2world = np.asarray(cam2world, dtype=np.float32)
+        points_world = points_camera @ cam2world[:3, :3].T
+        points_world += cam2world[:3, 3]
+
+        colors = np.take(image_rgb.reshape(-1, image_rgb.shape[-1]), idx, axis=0)
+        if labels is None:
+            return points_world, colors
+        return points_world, colors, np.take(labels.reshape(-1), idx)
+
+
+@functools.lru_cache(maxsize=8)
+def get_backprojector(width, height, fx, fy, cx, cy):
+    """Backprojector shared by every frame with the same intrinsics"""
+    return Backprojector(width, height, fx, fy, cx, cy)
+
+
+@functools.lru_cache(maxsize=8)
+def get_depth_noise(width, height, fx, fy, seed):
+    """DepthNoise (random pools + scratch buffers) shared by every frame of one camera"""
+    return depth_noise.DepthNoise(width, height, fx, fy, seed)
+
+
+def add_depth_noise(depth_map, meta, frame_index, noise_seed=None):
+    """L515-like degradation of depth_map in place; noise_seed None = clean depth"""
+    if noise_seed is None:
+        return depth_map
+    noise = get_depth_noise(meta["width"], meta["height"], meta["fx"], meta["fy"], noise_seed)
+    return noise.apply(depth_map, frame_index, out=depth_map)
+
 
 def create_colored_point_cloud(depth_map, image_rgb, fx, fy, cx, cy, cam2world):
     """將深度圖和RGB影像轉換為世界座標系中的彩色點雲"""
     height, width = depth_map.shape
-    
-    # build pixel coordinates
-    u = np.arange(width)
-    v = np.arange(height)
-    u, v = np.meshgrid(u, v)
-    
-    # filter out invalid depth values
-    valid_depth_mask = (depth_map > 0) & (depth_map < 100)
-    
-    Z = depth_map[valid_depth_mask]
-    u_valid = u[valid_depth_mask]
-    v_valid = v[valid_depth_mask]
-    colors = image_rgb[valid_depth_mask]
-    
-    # Transform to Camera coordinates
-    X_cam = (u_valid - cx) * Z / fx
-    Y_cam = -((v_valid - cy) * Z / fy)
-    Z_cam = -Z 
-
-    # Homogenous coordinates
-    points_camera = np.vstack((X_cam, Y_cam, Z_cam, np.ones_like(Z)))
-
-    # Transform to world coordinates
-    points_world = cam2world @ points_camera
-
-    return points_world[:3, :].T, colors
-
-
-def save_ply(filename, points, colors):
-    """將點和顏色資料儲存為 ASCII PLY 檔案"""
-
-    points_colored = np.hstack((points, colors.astype(np.uint8)))
-    num_points = len(points_colored)
-    
-    # PLY 
-    header = f"""ply
-                format ascii 1.0
-                element vertex {num_points}
-                property float x
-                property float y
-                property float z
-                property uchar red
-                property uchar green
-                property uchar blue
-                end_header
-            """    
-    # write to file
-    with open(filename, 'w') as f:
-        f.write(header)
-        np.savetxt(f, points_colored, fmt='%f %f %f %d %d %d')
+    backprojector = get_backprojector(width, height, fx, fy, cx, cy)
+    return backprojector(depth_map, image_rgb, cam2world)
+
+
+PLY_VERTEX_DTYPE = np.dtype([
+    ("x", "<f4"), ("y", "<f4"), ("z", "<f4"),
+    ("red", "u1"), ("green", "u1"), ("blue", "u1"),
+])
+
+# labeled clouds: + instance id (object pass_index) and semantic class id
+PLY_LABELED_VERTEX_DTYPE = np.dtype(PLY_VERTEX_DTYPE.descr + [("instance", "<i4"), ("semantic", "<i4")])
+
+PLY_ENCODINGS = ("binary_little_endian", "ascii")
+
+
+def ply_header(num_points, encoding="binary_little_endian", labeled=False):
+    """PLY header for an xyz + rgb (+ instance / semantic) vertex element"""
+    return (
+        "ply\n"
+        f"format {encoding} 1.0\n"
+        f"element vertex {num_points}\n"
+        "property float x\n"
+        "property float y\n"
+        "property float z\n"
+        "property uchar red\n"
+        "property uchar green\n"
+        "property uchar blue\n"
+        + ("property int instance\n"
+           "property int semantic\n" if labeled else "")
+        + "end_header\n"
+    )
+
+
+def save_ply(filename, points, colors, encoding="binary_little_endian", instances=None, semantics=None):
+    """將點和顏色資料儲存為 PLY 檔案
+
+    encoding: "binary_little_endian" (default) or "ascii"
+    instances, semantics: optional per-point labels, written as int properties
+    """
+    if encoding not in PLY_ENCODINGS:
+        raise ValueError(f"Unknown PLY encoding '{encoding}', expected one of {PLY_ENCODINGS}")
+
+    # one packed record per vertex: float32 xyz + uint8 rgb (15 bytes)
+    labeled = instances is not None
+    vertices = np.empty(len(points), dtype=PLY_LABELED_VERTEX_DTYPE if labeled else PLY_VERTEX_DTYPE)
+    vertices["x"] = points[:, 0]
+    vertices["y"] = points[:, 1]
+    vertices["z"] = points[:, 2]
+    vertices["red"] = colors[:, 0]
+    vertices["green"] = colors[:, 1]
+    vertices["blue"] = colors[:, 2]
+    if labeled:
+        vertices["instance"] = instances
+        vertices["semantic"] = 0 if semantics is None else semantics
+
+    header = ply_header(len(vertices), encoding, labeled)
+    if encoding == "ascii":
+        with open(filename, "w") as f:
+            f.write(header)
+            np.savetxt(f, vertices, fmt="%f %f %f %d %d %d" + (" %d %d" if labeled else ""))
+    else:
+        with open(filename, "wb") as f:
+            f.write(header.encode("ascii"))
+            vertices.tofile(f)
     print(f"Saved to: {filename}")
 
-if __name__ == "__main__":
+def frame_output_path(out_dir, frame):
+    return os.path.join(out_dir, f"colored_point_cloud_{frame.index:04d}.ply")
+
+
+def frame_labels(frame, labels):
+    """[] or [instances, semantics] for save_ply from the backprojector's extra output"""
+    if not labels:
+        return []
+    return [labels[0], semantic_labels(labels[0], frame.camera_path)]
+
+
+def downsample_frame(downsampler, frame_index, points, colors, labels):
+    """Keep the downsampler's subset of points, colors and every label array"""
+    if downsampler is None:
+        return points, colors, labels
+    keep = downsampler(points, frame_index)
+    return points[keep], colors[keep], [label[keep] for label in labels]
+
+
+def store_frame(frame, out_dir, points, colors, labels, encoding="binary_little_endian", shards=None):
+    """One PLY in out_dir, or one sample (+ gt boxes) of a point_store.ShardWriter"""
+    labels = frame_labels(frame, labels)
+    if shards is None:
+        path = frame_output_path(out_dir, frame)
+        save_ply(path, points, colors, encoding, *labels)
+        return path
+    boxes = point_store.gt_boxes(frame.gt_path) if frame.gt_path else (None, None)
+    # semantic ids index this scene's class map, the store remaps them to its own
+    class_map = load_camera_meta(frame.camera_path)["segmentation"]["classes"] if labels else None
+    name = f"{frame.index:04d}"
+    shards.add(name, points, colors, dict(zip(("instance", "semantic"), labels)), *boxes, class_map)
+    return name
+
+
+def convert_frame(frame, out_dir, encoding="binary_little_endian", fusion=None, noise_seed=None, shards=None,
+                  downsampler=None):
+    """rgb + depth + camera of one frame -> one PLY in out_dir
+
+    fusion: optional fusion.VoxelFusion that also accumulates the frame
+    noise_seed: degrade the depth with depth_noise (seeded per frame index), None = off
+    shards: optional point_store.ShardWriter that receives the frame instead of a PLY
+    downsampler: optional downsample.Downsampler applied to the back-projected points
+    """
+    meta = load_camera_meta(frame.camera_path)
+    W, H = meta["width"], meta["height"]
+    cam2world = np.array(meta["camera_to_world_4x4"])
+
+    img_rgb = read_frame_rgb(frame, W, H)
+    depth_map = read_depth(frame.depth_path, W, H, reuse_buffer=True)
+    instance_map = read_frame_instances(frame, W, H)
+    add_depth_noise(depth_map, meta, frame.index, noise_seed)
+
+    backprojector = get_backprojector(W, H, meta["fx"], meta["fy"], meta["cx"], meta["cy"])
+    points_3d, point_colors, *labels = backprojector(depth_map, img_rgb, cam2world, labels=instance_map)
+    points_3d, point_colors, labels = downsample_frame(downsampler, frame.index, points_3d, point_colors, labels)
 
-    points_3d, point_colors = create_colored_point_cloud(depth_map, img_rgb, fx, fy, cx, cy, cam2world)
+    output = store_frame(frame, out_dir, points_3d, point_colors, labels, encoding, shards)
+    if fusion is not None:
+        fusion.add(points_3d, point_colors)
+    return output
 
-    ply_output_path = os.path.join(OUT_DIR, "colored_point_cloud.ply")
-    save_ply(ply_output_path, points_3d, point_colors)
\ No newline at end of file
+
+def convert_directory(in_dir, out_dir, jobs=1, encoding="binary_little_endian",
+                      readers=2, prefetch=8, fusion=None, noise_seed=None, shards=None,
+                      downsampler=None):
+    """Convert every frame found in in_dir, one point cloud per frame
+
+    jobs > 1 runs the frames through frame_pipeline.FramePipeline: reader
+    threads prefetch at most `prefetch` decoded frames for `jobs` worker
+    processes. With `fusion` every frame is also merged into that
+    fusion.VoxelFusion grid. noise_seed turns on the depth_noise stage.
+    With `shards` (point_store.ShardWriter) the frames are packed into
+    shards instead of written as one PLY each. `downsampler`
+    (downsample.Downsampler) thins every frame before it is written.
+    """
+    frames = discover_frames(in_dir)
+    if not frames:
+        raise FileNotFoundError(f"No depth_####.exr frames in {in_dir}")
+    os.makedirs(out_dir, exist_ok=True)
+
+    if jobs <= 1:
+        return [convert_frame(frame, out_dir, encoding, fusion, noise_seed, shards, downsampler)
+                for frame in frames]
+
+    # imported here: frame_pipeline itself imports this module
+    import frame_pipeline
+    pipeline = frame_pipeline.FramePipeline(out_dir, jobs, readers, prefetch, encoding, fusion, noise_seed,
+                                              shards, downsampler)
+    outputs, stats = pipeline.run(frames)
+    peak = "n/a" if stats.peak_rss_mb is None else f"{stats.peak_rss_mb:.0f} MB"
+    print(f"[Pipeline] {stats.frames} frames in {stats.seconds:.2f}s "
+          f"({stats.fps:.1f} frames/s), peak RSS {peak}")
+    return outputs
+
+
+def benchmark_save_ply(num_points=300000, repeats=3):
+    """Write time and file size of save_ply per encoding, random cloud of num_points"""
+    rng = np.random.default_rng(0)
+    points = rng.uniform(-5, 5, (num_points, 3)).astype(np.float32)
+    colors = rng.integers(0, 256, (num_points, 3), dtype=np.uint8)
+    with tempfile.TemporaryDirectory() as tmp:
+        for encoding in PLY_ENCODINGS:
+            path = os.path.join(tmp, f"{encoding}.ply")
+            start = time.perf_counter()
+            for _ in range(repeats):
+                save_ply(path, points, colors, encoding)
+            ms = (time.perf_counter() - start) / repeats * 1000
+            print(f"[save_ply {encoding:>20}] {num_points} points: {ms:.1f} ms, "
+                  f"{os.path.getsize(path) / 2**20:.1f} MB")
+
+
+def _meshgrid_point_cloud(depth_map, image_rgb, fx, fy, cx, cy, cam2world):
+    """Per-frame meshgrid + homogeneous 4xN product, the path Backprojector replaced (benchmark reference)"""
+    height, width = depth_map.shape
+    u, v = np.meshgrid(np.arange(width), np.arange(height))
+    valid = (depth_map > 0) & (depth_map < 100)
+    Z = depth_map[valid]
+    X = (u[valid] - cx) * Z / fx
+    Y = -((v[valid] - cy) * Z / fy)
+    points = cam2world @ np.vstack((X, Y, -Z, np.ones_like(Z)))
+    return points[:3, :].T, image_rgb[valid]
+
+
+def benchmark_backprojection(width=640, height=480, repeats=20):
+    """ms per frame of the cached Backprojector vs. the meshgrid path, synthetic depth"""
+    rng = np.random.default_rng(0)
+    depth = rng.uniform(0.5, 8.0, (height, width)).astype(np.float32)
+    depth[rng.random((height, width)) < 0.17] = 1e10  # background
+    rgb = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+    cam2world = np.eye(4)
+    cam2world[:3, 3] = (1.0, 2.0, 1.4)
+    intrinsics = (609.96, 610.13, 328.0, 241.1)
+
+    results = {}
+    for name, fn in (("meshgrid", _meshgrid_point_cloud), ("cached rays", create_colored_point_cloud)):
+        fn(depth, rgb, *intrinsics, cam2world)
+        start = time.perf_counter()
+        for _ in range(repeats):
+            results[name] = fn(depth, rgb, *intrinsics, cam2world)
+        ms = (time.perf_counter() - start) / repeats * 1000
+        print(f"[Backproject {name:>12}] {width}x{height}: {ms:.1f} ms/frame")
+    error = np.abs(results["meshgrid"][0] - results["cached rays"][0]).max()
+    print(f"[Backproject] {len(results['cached rays'][0])} points, max difference {error:.1e} m")
+
+
+def benchmark():
+    benchmark_save_ply()
+    benchmark_backprojection()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Convert rendered rgb/depth frames to colored point clouds")
+    parser.add_argument("--in-dir", default=IN_DIR, help="directory with depth_####.exr, rgb_####.png, camera json")
+    parser.add_argument("--out-dir", default=OUT_DIR, help="directory for the output PLY files")
+    parser.add_argument("--jobs", type=int, default=1, help="number of worker processes")
+    parser.add_argument("--readers", type=int, default=2, help="I/O threads decoding EXR/PNG (with --jobs > 1)")
+    parser.add_argument("--prefetch", type=int, default=8, help="max decoded frames waiting for a worker")
+    parser.add_argument("--ascii", action="store_true", help="write ASCII PLY instead of binary")
+    parser.add_argument("--fuse-voxel", type=float, default=None,
+                        help="also fuse all frames into one cloud on a voxel grid of this size (m)")
+    parser.add_argument("--noise", action="store_true",
+                        help="degrade the depth like a RealSense L515 before back-projection (depth_noise.py)")
+    parser.add_argument("--shard-dir", default=None,
+                        help="pack all frames into a point_store dataset here instead of one PLY per frame")
+    parser.add_argument("--downsample", default=None, metavar="METHOD:VALUE",
+                        help="thin every frame: voxel:SIZE (m), fps:N or random:N (downsample.py)")
+    parser.add_argument("--downsample-seed", type=int, default=0, help="seed of fps / random, per frame index")
+    parser.add_argument("--noise-seed", type=int, default=0, help="seed of --noise, per frame index")
+    parser.add_argument("--benchmark", action="store_true", help="time the conversion steps on synthetic data and exit")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.benchmark:
+        benchmark()
+        return
+    encoding = "ascii" if args.ascii else "binary_little_endian"
+    fusion = None
+    if args.fuse_voxel:
+        import fusion as fusion_module
+        fusion = fusion_module.VoxelFusion(args.fuse_voxel)
+    shards = point_store.ShardWriter(args.shard_dir) if args.shard_dir else None
+    downsampler = downsample.Downsampler.from_spec(args.downsample, args.downsample_seed) if args.downsample else None
+
+    outputs = convert_directory(args.in_dir, args.out_dir, args.jobs, encoding,
+                                args.readers, args.prefetch, fusion,
+                                args.noise_seed if args.noise else None, shards, downsampler)
+    if shards is None:
+        print(f"[DONE] {len(outputs)} point clouds -> {args.out_dir}")
+    else:
+        shards.close()
+        print(f"[DONE] {len(outputs)} frames -> {len(shards.shards)} shard(s) in {args.shard_dir}")
+
+    if fusion is not None:
+        points, colors = fusion.result()
+        save_ply(os.path.join(args.out_dir, "fused_point_cloud.ply"), points, colors, encoding)
+        print(f"[Fusion] {len(points)} voxels of {args.fuse_voxel} m")
+
+
+if __name__ == "__main__":
+    main()
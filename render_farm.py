@@ -0,0 +1,183 @@
+import argparse
+import json
+import os
+import subprocess
+import time
+from collections import namedtuple
+
+import trajectory
+
+RENDER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "render_scene.py")
+INDEX_FILE = "index.json"
+
+# one contiguous frame range rendered by one headless Blender process
+Shard = namedtuple("Shard", ["id", "frame_start", "frame_end", "out_dir"])
+
+
+def make_shards(num_frames, num_shards, out_dir):
+    num_shards = max(1, min(num_shards, num_frames))
+    bounds = [round(i * num_frames / num_shards) for i in range(num_shards + 1)]
+    return [Shard(i, bounds[i] + 1, bounds[i + 1], os.path.join(out_dir, f"shard_{i:03d}"))
+            for i in range(num_shards)]
+
+
+def frame_files(out_dir, frame, depth_only=False):
+    files = {
+        "rgb": os.path.join(out_dir, f"rgb_{frame:04d}.png"),
+        "depth": os.path.join(out_dir, f"depth_{frame:04d}.exr"),
+        "camera": os.path.join(out_dir, f"camera_{frame:04d}.json"),
+    }
+    if depth_only:
+        del files["rgb"]
+    return files
+
+
+def missing_frames(shard, depth_only=False):
+    """Frames of the shard whose rgb/depth/camera outputs are not all there"""
+    return [frame for frame in range(shard.frame_start, shard.frame_end + 1)
+            if not all(os.path.exists(p) and os.path.getsize(p) > 0
+                       for p in frame_files(shard.out_dir, frame, depth_only).values())]
+
+
+def blender_command(blender, scene_file, trajectory_file, shard, threads, extra_args=()):
+    command = [blender, "-b", scene_file, "--python-exit-code", "1"]
+    if threads:
+        command += ["-t", str(threads)]
+    command += ["--python", RENDER_SCRIPT, "--",
+                "--out-dir", shard.out_dir,
+                "--trajectory", trajectory_file,
+                "--frame-start", str(shard.frame_start),
+                "--frame-end", str(shard.frame_end)]
+    return command + list(extra_args)
+
+
+class RenderFarm:
+    """Runs shards of a trajectory on up to `workers` background Blender processes
+
+    A shard that exits non-zero or leaves frames missing is re-queued, at
+    most `retries` times; render_scene.py's manifest makes the retry skip
+    the frames that were already finished. Every shard logs to
+    <shard dir>/render.log.
+    """
+
+    def __init__(self, scene_file, trajectory_file, out_dir, workers=None, blender="blender",
+                 retries=2, threads=None, extra_args=(), poll_interval=1.0, depth_only=False):
+        self.scene_file = scene_file
+        self.trajectory_file = trajectory_file
+        self.out_dir = out_dir
+        self.workers = workers or os.cpu_count() or 1
+        self.blender = blender
+        self.retries = retries
+        # Cycles CPU threads per process, so the workers share the cores
+        self.threads = threads if threads is not None else max(1, (os.cpu_count() or 1) // self.workers)
+        self.depth_only = depth_only
+        self.extra_args = list(extra_args) + (["--depth-only"] if depth_only else [])
+        self.poll_interval = poll_interval
+
+    def _launch(self, shard):
+        os.makedirs(shard.out_dir, exist_ok=True)
+        log = open(os.path.join(shard.out_dir, "render.log"), "a")
+        command = blender_command(self.blender, self.scene_file, self.trajectory_file,
+                                  shard, self.threads, self.extra_args)
+        return subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT), log
+
+    def run(self, shards):
+        """Render all shards, returns the shards that still failed after retries"""
+        queue = [(shard, 0) for shard in shards]
+        running, failed = [], []
+        while queue or running:
+            while queue and len(running) < self.workers:
+                shard, attempt = queue.pop(0)
+                process, log = self._launch(shard)
+                running.append((shard, attempt, process, log))
+                print(f"[Farm] shard {shard.id} frames {shard.frame_start}-{shard.frame_end} (attempt {attempt + 1})")
+
+            time.sleep(self.poll_interval)
+            still_running = []
+            for shard, attempt, process, log in running:
+                if process.poll() is None:
+                    still_running.append((shard, attempt, process, log))
+                    continue
+                log.close()
+                missing = missing_frames(shard, self.depth_only)
+                if process.returncode == 0 and not missing:
+                    print(f"[Farm] shard {shard.id} done")
+                elif attempt < self.retries:
+                    print(f"[Farm] shard {shard.id} failed (exit {process.returncode}, "
+                          f"{len(missing)} frames missing), retrying")
+                    queue.append((shard, attempt + 1))
+                else:
+                    print(f"[Farm] shard {shard.id} failed after {attempt + 1} attempts")
+                    failed.append(shard)
+            running = still_running
+        return failed
+
+
+def merge_index(shards, out_dir, depth_only=False):
+    """One dataset index over all shard outputs, paths relative to out_dir"""
+    frames = []
+    for shard in shards:
+        for frame in range(shard.frame_start, shard.frame_end + 1):
+            files = frame_files(shard.out_dir, frame, depth_only)
+            if all(os.path.exists(p) for p in files.values()):
+                entry = {"frame": frame}
+                entry.update({key: os.path.relpath(path, out_dir) for key, path in files.items()})
+                # optional outputs: skipped with render_scene.py --no-gt / --no-index
+                for key, name in (("gt", f"gt_{frame:04d}.json"), ("index", f"index_{frame:04d}.exr")):
+                    path = os.path.join(shard.out_dir, name)
+                    if os.path.exists(path):
+                        entry[key] = os.path.relpath(path, out_dir)
+                frames.append(entry)
+    index_path = os.path.join(out_dir, INDEX_FILE)
+    with open(index_path, "w", encoding="utf-8") as f:
+        json.dump({"frames": frames}, f, indent=2)
+    return index_path, len(frames)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Shard a camera trajectory over headless Blender workers")
+    parser.add_argument("scene", help=".blend file, e.g. scenes/cvrlab.blend")
+    parser.add_argument("--out-dir", default=os.path.join("tmp", "render_farm"))
+    parser.add_argument("--trajectory", help="JSON trajectory (trajectory.save_trajectory format)")
+    parser.add_argument("--generate", choices=["orbit", "random_walk", "grid"], help="generate the trajectory")
+    parser.add_argument("--num-poses", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--room", default=trajectory.DEFAULT_ROOM, help="room spec the generated poses keep clear of")
+    parser.add_argument("--workers", type=int, default=None, help="concurrent Blender processes")
+    parser.add_argument("--shards", type=int, default=None, help="number of frame ranges (default: workers)")
+    parser.add_argument("--threads", type=int, default=None, help="render threads per worker")
+    parser.add_argument("--retries", type=int, default=2)
+    parser.add_argument("--blender", default="blender", help="Blender executable")
+    parser.add_argument("--depth-only", action="store_true", help="render depth_####.exr only (BVH ray casting)")
+    parser.add_argument("--half-depth", action="store_true", help="half-float depth EXRs (render_scene.py --half-depth)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    os.makedirs(args.out_dir, exist_ok=True)
+
+    # every worker reads the same trajectory file, so poses are identical across shards
+    trajectory_file = os.path.abspath(os.path.join(args.out_dir, "trajectory.json"))
+    if args.trajectory:
+        poses = trajectory.load_trajectory(args.trajectory)
+    elif args.generate:
+        poses = trajectory.generate(args.generate, args.num_poses, args.seed, args.room)
+    else:
+        raise SystemExit("either --trajectory or --generate is required")
+    trajectory.save_trajectory(trajectory_file, poses)
+
+    farm = RenderFarm(os.path.abspath(args.scene), trajectory_file, args.out_dir,
+                      args.workers, args.blender, args.retries, args.threads,
+                      extra_args=["--half-depth"] if args.half_depth else (), depth_only=args.depth_only)
+    shards = make_shards(len(poses), args.shards or farm.workers, os.path.abspath(args.out_dir))
+    start = time.perf_counter()
+    failed = farm.run(shards)
+    index_path, num_frames = merge_index(shards, os.path.abspath(args.out_dir), args.depth_only)
+    print(f"[DONE] {num_frames}/{len(poses)} frames in {time.perf_counter() - start:.1f}s -> {index_path}")
+    if failed:
+        raise SystemExit(f"{len(failed)} shard(s) failed: {[shard.id for shard in failed]}")
+
+
+if __name__ == "__main__":
+    main()
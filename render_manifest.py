@@ -0,0 +1,100 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+MANIFEST_FILE = "manifest.sqlite"
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+PNG_TRAILER = b"IEND\xaeB`\x82"
+EXR_MAGIC = b"\x76\x2f\x31\x01"
+
+
+def hash_pose(pose, decimals=6):
+    """Stable hash of a 4x4 camera_to_world pose"""
+    rows = [[round(float(v), decimals) + 0.0 for v in row] for row in pose]
+    return hashlib.sha1(json.dumps(rows).encode()).hexdigest()
+
+
+def hash_config(config):
+    """Stable hash of a JSON-serializable render configuration"""
+    return hashlib.sha1(json.dumps(config, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def file_digest(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def looks_complete(path):
+    """Cheap structural check that catches truncated PNG / EXR files"""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return False
+    with open(path, "rb") as f:
+        head = f.read(8)
+        if path.endswith(".png"):
+            f.seek(-len(PNG_TRAILER), os.SEEK_END)
+            return head == PNG_SIGNATURE and f.read() == PNG_TRAILER
+        if path.endswith(".exr"):
+            return head[:4] == EXR_MAGIC
+    return True
+
+
+class RenderManifest:
+    """Per-frame record of finished renders in <out_dir>/manifest.sqlite
+
+    A frame counts as done only if its pose hash and config hash match and
+    every output file still has the recorded size and sha256. Frames are
+    recorded after all their files are written, so a crash mid-frame
+    leaves the frame pending.
+    """
+
+    def __init__(self, out_dir):
+        self.out_dir = out_dir
+        self.path = os.path.join(out_dir, MANIFEST_FILE)
+        self.db = sqlite3.connect(self.path)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS frames ("
+            " frame INTEGER PRIMARY KEY, pose_hash TEXT, config_hash TEXT,"
+            " files TEXT, updated REAL)")
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+    def is_complete(self, frame, pose_hash, config_hash, files):
+        """files: {name: path} expected for this frame"""
+        row = self.db.execute(
+            "SELECT pose_hash, config_hash, files FROM frames WHERE frame = ?", (frame,)).fetchone()
+        if row is None or row[0] != pose_hash or row[1] != config_hash:
+            return False
+        recorded = json.loads(row[2])
+        for name, path in files.items():
+            entry = recorded.get(name)
+            if entry is None or not os.path.exists(path) or os.path.getsize(path) != entry["size"]:
+                return False
+            if file_digest(path) != entry["sha256"]:
+                return False
+        return True
+
+    def pending(self, frames, pose_hashes, config_hash, files_of):
+        """Frames that are missing, stale or corrupted; files_of(frame) -> {name: path}"""
+        return [frame for frame, pose_hash in zip(frames, pose_hashes)
+                if not self.is_complete(frame, pose_hash, config_hash, files_of(frame))]
+
+    def record(self, frame, pose_hash, config_hash, files):
+        entries = {}
+        for name, path in files.items():
+            if not looks_complete(path):
+                raise RuntimeError(f"Frame {frame}: '{path}' is missing or truncated")
+            entries[name] = {"path": os.path.relpath(path, self.out_dir),
+                             "size": os.path.getsize(path),
+                             "sha256": file_digest(path)}
+        self.db.execute(
+            "INSERT OR REPLACE INTO frames VALUES (?, ?, ?, ?, ?)",
+            (frame, pose_hash, config_hash, json.dumps(entries), time.time()))
+        self.db.commit()
@@ -1,8 +1,21 @@
 import bpy
-import math
+from mathutils import Matrix
+import argparse
 import numpy as np
 import os
+import sys
 import json
+import time
+
+# modules next to this script (trajectory.py, ...)
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.append(SCRIPT_DIR)
+import camera_config
+import depth_raycast
+import ground_truth
+import render_manifest
+import trajectory
 
 def add_light(data):
     light_data = bpy.data.lights.new(name=data["name"], type=data["type"])
@@ -31,23 +44,239 @@ def setup_l515_camera(cam_obj, data:dict):
     """
 
     # focal length (mm)
-    f = data["sensor_width"]/2*math.tan(np.deg2rad(data["fov_h"]))
+    f = camera_config.lens_mm(data)
 
     cam_obj.data.lens = f
     cam_obj.data.sensor_width = data["sensor_width"]
     cam_obj.data.sensor_height = data["sensor_width"] * data["img_h"] / data["img_w"]
     
-    # shift
-    shift_x = (data["cx"] - data["img_w"] / 2) / data["img_w"]
-    shift_y = (data["cy"] - data["img_h"] / 2) / data["img_h"]
-    cam_obj.data.shift_x = shift_x
-    cam_obj.data.shift_y = shift_y
+    # shift: principal point offset, in units of the larger image side
+    cam_obj.data.sensor_fit = "AUTO"
+    cam_obj.data.shift_x, cam_obj.data.shift_y = camera_config.lens_shift(data)
 
     cam_obj.data.clip_start = data["min_depth"]
     cam_obj.data.clip_end   = data["max_depth"]
 
     return cam_obj, f
 
+def configure_depth_output(node, fmt):
+    """EXR settings of the depth File Output node
+
+    fmt: dict(
+    color_depth : '32' full float or '16' half float
+    exr_codec : 'ZIP', 'PIZ', 'DWAA', ... (DWAA/DWAB are lossy)
+    color_mode : 'BW' single channel, 'RGB' / 'RGBA' copy depth into every channel
+    )
+    """
+    node.format.file_format = 'OPEN_EXR'
+    node.format.color_depth = fmt["color_depth"]
+    node.format.exr_codec = fmt["exr_codec"]
+    node.format.color_mode = fmt["color_mode"]
+
+def keyframe_camera(cam_obj, poses, frame_start=1):
+    """Keyframe one camera_to_world 4x4 pose per frame onto cam_obj"""
+    prefs = bpy.context.preferences.edit
+    interpolation = prefs.keyframe_new_interpolation_type
+    prefs.keyframe_new_interpolation_type = 'CONSTANT'  # no tweening between poses
+    try:
+        for i, pose in enumerate(poses):
+            frame = frame_start + i
+            cam_obj.matrix_world = Matrix(np.asarray(pose).tolist())
+            cam_obj.keyframe_insert(data_path="location", frame=frame)
+            cam_obj.keyframe_insert(data_path="rotation_euler", frame=frame)
+    finally:
+        prefs.keyframe_new_interpolation_type = interpolation
+    return frame_start, frame_start + len(poses) - 1
+
+def camera_meta(cam_obj, data:dict, focal_mm, intrinsics, segmentation=None):
+    """camera.json content for the current frame
+
+    intrinsics: (fx, fy, cx, cy) Blender renders with (depth_raycast.view_intrinsics)
+    segmentation: class map of index_####.exr (ground_truth.assign_pass_indices)
+    """
+    ## Blender camera 前是 -Z、上是 +Y
+    ## matrix_world 4x4 matrix。
+    cam2world = np.array(cam_obj.matrix_world)  # 轉 numpy
+    return {
+        "width": data["img_w"], "height": data["img_h"],
+        **dict(zip(("fx", "fy", "cx", "cy"), map(float, intrinsics))),
+        "sensor_width_mm": data["sensor_width"], "sensor_height_mm": data["sensor_width"] * data["img_h"] / data["img_w"],
+        "focal_length_mm": focal_mm,
+        "camera_to_world_4x4": cam2world.tolist(),
+        **({"segmentation": segmentation} if segmentation else {})
+    }
+
+def write_camera_json(path, meta):
+    with open(path, "w", encoding="utf-8") as fp:
+        json.dump(meta, fp, indent=2)
+
+def frame_outputs(out_dir, frame, camera_file, depth_only=False, gt=False, index=False):
+    """Files one rendered frame must leave in out_dir"""
+    outputs = {
+        "rgb": os.path.join(out_dir, f"rgb_{frame:04d}.png"),
+        "depth": os.path.join(out_dir, f"depth_{frame:04d}.exr"),
+        "camera": os.path.join(out_dir, camera_file),
+    }
+    if depth_only:
+        del outputs["rgb"]
+    if gt:
+        outputs["gt"] = os.path.join(out_dir, f"gt_{frame:04d}.json")
+    if index:
+        outputs["index"] = os.path.join(out_dir, f"index_{frame:04d}.exr")
+    return outputs
+
+def use_eevee(scene):
+    """Rasterized depth: EEVEE with a single sample"""
+    for engine in ('BLENDER_EEVEE_NEXT', 'BLENDER_EEVEE'):
+        try:
+            scene.render.engine = engine
+            break
+        except TypeError:  # engine name of another Blender version
+            continue
+    scene.eevee.taa_render_samples = 1
+
+# OpenGL renderers without a GPU: EEVEE runs, but slower than BVH ray casting
+SOFTWARE_RENDERERS = ("llvmpipe", "softpipe", "swiftshader", "software")
+
+def gpu_context():
+    """True when Blender has a hardware GPU context EEVEE can render with"""
+    try:
+        import gpu
+        renderer = gpu.platform.renderer_get()
+    except (ImportError, AttributeError, SystemError, RuntimeError):  # no context, e.g. headless -b
+        return False
+    return bool(renderer) and not any(name in renderer.lower() for name in SOFTWARE_RENDERERS)
+
+def setup_device(scene, device="auto", backends=None):
+    """Use the first GPU backend that has a device, otherwise fall back to CPU
+
+    device: "auto", "gpu" (fail without a GPU) or "cpu"
+    returns the backend name, or "CPU"
+    """
+    backends = backends or GPU_BACKENDS
+    prefs = bpy.context.preferences.addons['cycles'].preferences
+    if device != "cpu":
+        for backend in backends:
+            try:
+                prefs.compute_device_type = backend
+            except TypeError:  # backend not compiled into this Blender build
+                continue
+            prefs.get_devices()
+            gpus = [d for d in prefs.devices if d.type == backend]
+            if gpus:
+                for d in prefs.devices:
+                    d.use = d.type == backend
+                scene.cycles.device = 'GPU'
+                return backend
+        if device == "gpu":
+            raise RuntimeError(f"No GPU device found for backends {backends}")
+    prefs.compute_device_type = 'NONE'
+    scene.cycles.device = 'CPU'
+    return "CPU"
+
+def apply_render_profile(scene, profile:dict, threads=None):
+    """Cycles sampling / light path / performance settings of a render profile
+
+    threads: CPU render threads, None = all cores
+    """
+    cycles = scene.cycles
+    cycles.samples = profile["samples"]
+    cycles.use_adaptive_sampling = True
+    cycles.adaptive_threshold = profile["adaptive_threshold"]
+    cycles.use_denoising = profile["denoise"]
+    if profile["denoise"]:
+        cycles.denoiser = 'OPENIMAGEDENOISE'
+
+    cycles.max_bounces = profile["max_bounces"]
+    cycles.diffuse_bounces = min(cycles.diffuse_bounces, profile["max_bounces"])
+    cycles.glossy_bounces = min(cycles.glossy_bounces, profile["max_bounces"])
+    cycles.transmission_bounces = min(cycles.transmission_bounces, profile["max_bounces"])
+    cycles.caustics_reflective = profile["caustics"]
+    cycles.caustics_refractive = profile["caustics"]
+
+    # 640x480 fits in one tile, no tiling overhead
+    cycles.use_auto_tile = False
+    cycles.tile_size = profile["tile_size"]
+    # keep BVH / textures between the frames of a trajectory
+    scene.render.use_persistent_data = profile["persistent_data"]
+    if threads:
+        scene.render.threads_mode = 'FIXED'
+        scene.render.threads = threads
+    else:
+        scene.render.threads_mode = 'AUTO'
+
+def render_still(scene, path):
+    """Render the current frame to path (scene image settings), returns (H, W, 3) float32 pixels and seconds"""
+    scene.render.filepath = path
+    start = time.perf_counter()
+    bpy.ops.render.render(write_still=True)
+    seconds = time.perf_counter() - start
+    image = bpy.data.images.load(path)
+    width, height, channels = image.size[0], image.size[1], image.channels
+    pixels = np.empty(width * height * channels, dtype=np.float32)
+    image.pixels.foreach_get(pixels)
+    bpy.data.images.remove(image)
+    return pixels.reshape(height, width, channels)[..., :3], seconds
+
+def psnr(image, reference, peak=1.0):
+    """Peak signal-to-noise ratio (dB) of image against reference, inf when identical"""
+    mse = float(np.mean((np.asarray(image, np.float64) - np.asarray(reference, np.float64)) ** 2))
+    return float("inf") if mse == 0 else 10 * np.log10(peak ** 2 / mse)
+
+def benchmark_profiles(scene, out_dir, threads=None, reference="final"):
+    """Seconds / frame of every RENDER_PROFILES entry at the current frame and PSNR against `reference`
+
+    blender -b scenes/cvrlab.blend --python render_scene.py -- --benchmark-profiles
+    Renders go to out_dir/profile_<name>.png (16-bit); a first fast-preview
+    render loads the BVH and textures and is not timed.
+    """
+    use_compositing = scene.render.use_compositing
+    scene.render.use_compositing = False  # the File Output nodes would write rgb_ / depth_ frames
+    settings = scene.render.image_settings
+    settings.file_format, settings.color_mode, settings.color_depth = 'PNG', 'RGB', '16'
+    try:
+        apply_render_profile(scene, RENDER_PROFILES["fast-preview"], threads)
+        render_still(scene, os.path.join(out_dir, "profile_warmup.png"))
+        images, seconds = {}, {}
+        for name in [reference] + sorted(set(RENDER_PROFILES) - {reference}):
+            apply_render_profile(scene, RENDER_PROFILES[name], threads)
+            images[name], seconds[name] = render_still(scene, os.path.join(out_dir, f"profile_{name}.png"))
+        for name in sorted(RENDER_PROFILES, key=seconds.get):
+            print(f"[Profile] {name}: {seconds[name]:.2f} s/frame, "
+                  f"PSNR {psnr(images[name], images[reference]):.2f} dB vs {reference}")
+    finally:
+        scene.render.use_compositing = use_compositing
+    return seconds
+
+def parse_args():
+    """Arguments after `--`: blender -b scene.blend --python render_scene.py -- --generate orbit"""
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(description="Render rgb/depth frames of the current scene")
+    parser.add_argument("--out-dir", default=OUT_DIR)
+    parser.add_argument("--trajectory", help="JSON file with a list of camera_to_world_4x4 poses")
+    parser.add_argument("--generate", choices=["orbit", "random_walk", "grid"], help="generate the trajectory")
+    parser.add_argument("--num-poses", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--room", default=trajectory.DEFAULT_ROOM, help="room spec the generated poses keep clear of")
+    parser.add_argument("--frame-start", type=int, default=None, help="first trajectory frame to render (1-based)")
+    parser.add_argument("--frame-end", type=int, default=None, help="last trajectory frame to render (inclusive)")
+    parser.add_argument("--no-resume", action="store_true", help="re-render frames already in the manifest")
+    parser.add_argument("--profile", choices=sorted(RENDER_PROFILES), default=RENDER_PROFILE)
+    parser.add_argument("--device", choices=["auto", "gpu", "cpu"], default="auto")
+    parser.add_argument("--threads", type=int, default=None, help="CPU render threads (default: all cores)")
+    parser.add_argument("--benchmark-profiles", action="store_true",
+                        help="render the first pose with every profile, print s/frame and PSNR vs final, then exit")
+    parser.add_argument("--depth-only", action="store_true", help="write depth_####.exr + camera json, no RGB")
+    parser.add_argument("--depth-engine", choices=["auto", "bvh", "eevee"], default="auto",
+                        help="depth-only renderer: BVH ray casting (CPU, no GPU context, one Python ray_cast per pixel), "
+                             "EEVEE (rasterized, needs a GPU context) or auto = EEVEE when a GPU context exists")
+    parser.add_argument("--half-depth", action="store_true", help="write depth as half float (HALF_DEPTH_FORMAT)")
+    parser.add_argument("--no-gt", action="store_true", help="skip the gt_####.json 3D box export")
+    parser.add_argument("--no-index", action="store_true", help="skip the index_####.exr object index pass")
+    parser.add_argument("--gt-classes", nargs="+", default=list(ground_truth.GT_CLASSES),
+                        help="object names (without _copyN) that get ground-truth boxes")
+    return parser.parse_args(argv)
+
 # Add a light 
 positions = [
     (-4, -1, 3.5),
@@ -82,36 +311,67 @@ camera_object.rotation_euler = (np.deg2rad(90), 0, np.deg2rad(0)) # View
 cam = bpy.data.objects['Camera']
 
 # L515 640x480 Color stream intrinsic
-cfg = {
-    "img_w" : 640,
-    "img_h" : 480,
-    "cx" : 328.002136230469,
-    "cy" : 241.126098632813,
-    "fx" : 609.959655761719,
-    "fy" : 610.131958007813,
-    "fov_h" : 55.36, 
-    "fov_v" : 42.94,
-    "sensor_width" : 2.47,
-    "min_depth" : 0.25,
-    "max_depth" : 9.0
-}
+cfg = dict(camera_config.L515)
 
 # setup cam
 cam, f = setup_l515_camera(cam, cfg)
 
+# Cycles render profiles: a depth + RGB training set does not need a converged path trace
+RENDER_PROFILES = {
+    "fast-preview" : {
+        "samples" : 16, "adaptive_threshold" : 0.1, "denoise" : True,
+        "max_bounces" : 2, "caustics" : False, "persistent_data" : True, "tile_size" : 2048
+    },
+    "dataset" : {
+        "samples" : 64, "adaptive_threshold" : 0.05, "denoise" : True,
+        "max_bounces" : 4, "caustics" : False, "persistent_data" : True, "tile_size" : 2048
+    },
+    "final" : {
+        "samples" : 1024, "adaptive_threshold" : 0.01, "denoise" : True,
+        "max_bounces" : 12, "caustics" : True, "persistent_data" : True, "tile_size" : 2048
+    },
+}
+RENDER_PROFILE = "dataset"
+
+# GPU backends tried in order before falling back to CPU
+GPU_BACKENDS = ("OPTIX", "CUDA", "HIP", "METAL", "ONEAPI")
+
+# Depth EXR: one full-float channel instead of Blender's default RGBA float
+DEPTH_FORMAT = {
+    "color_depth" : '32',
+    "exr_codec" : 'ZIP',
+    "color_mode" : 'BW'
+}
+# --half-depth: ~20x smaller files, but quantized to up to ~3.9 mm at 9 m
+HALF_DEPTH_FORMAT = dict(DEPTH_FORMAT, color_depth='16')
+
+# Object index: integer pass_index stored as float, lossless ZIP keeps it exact
+INDEX_FORMAT = {
+    "color_depth" : '32',
+    "exr_codec" : 'ZIP',
+    "color_mode" : 'BW'
+}
+
 ## output dir
 #OUT_DIR = "E:/NCU/blender_synthetic_scenes/tmp/blender_output"
 OUT_DIR = "D:/blender_synthetic_scenes/tmp/blender_output"
+args = parse_args()
+OUT_DIR = args.out_dir
 os.makedirs(OUT_DIR, exist_ok=True)
+depth_format = HALF_DEPTH_FORMAT if args.half_depth else DEPTH_FORMAT
 scene = bpy.context.scene
 
 # set render engine and device
 scene.render.engine = 'CYCLES'
-bpy.context.scene.cycles.device = 'GPU'
-bpy.context.preferences.addons['cycles'].preferences.compute_device_type = 'CUDA'
-bpy.context.preferences.addons['cycles'].preferences.get_devices()
-for device in bpy.context.preferences.addons['cycles'].preferences.devices:
-    device.use = True
+device = setup_device(scene, args.device)
+apply_render_profile(scene, RENDER_PROFILES[args.profile], args.threads)
+print(f"[Render] device: {device}, profile: {args.profile}")
+if args.depth_engine == "auto":
+    args.depth_engine = "eevee" if gpu_context() else "bvh"
+if args.depth_only:
+    print(f"[Render] depth engine: {args.depth_engine}")
+if args.depth_only and args.depth_engine == "eevee":
+    use_eevee(scene)
 scene.render.resolution_x = cfg["img_w"]
 scene.render.resolution_y = cfg["img_h"]
 scene.render.pixel_aspect_x = 1.0
@@ -124,6 +384,12 @@ view_layer.use = True
 scene = bpy.context.scene
 scene.view_layers[0].use_pass_z = True
 
+# Object index pass: every mesh gets a pass_index, the class map goes into the camera json
+# (EEVEE has no object index pass, depth-only EEVEE renders skip it)
+write_index = not args.no_index and not (args.depth_only and args.depth_engine == "eevee")
+segmentation = ground_truth.assign_pass_indices(scene) if write_index else None
+scene.view_layers[0].use_pass_object_index = write_index
+
 # Compositor：output RGB and Depth(EXR)
 scene.use_nodes = True
 scene.render.use_compositing = True
@@ -149,75 +415,127 @@ out_z = tree.nodes.new("CompositorNodeOutputFile")
 out_z.label = "Depth Output"
 out_z.base_path = OUT_DIR
 out_z.file_slots[0].path = "depth_"  # depth_0001.exr
-out_z.format.file_format = 'OPEN_EXR'
+configure_depth_output(out_z, depth_format)
 out_z.location = (200, -100)
 
+# Object index output
+out_index = tree.nodes.new("CompositorNodeOutputFile")
+out_index.label = "Index Output"
+out_index.base_path = OUT_DIR
+out_index.file_slots[0].path = "index_"  # index_0001.exr
+configure_depth_output(out_index, INDEX_FORMAT)
+out_index.location = (200, -300)
+
 # connect nodes
 tree.links.new(rl.outputs["Image"], out_rgb.inputs[0])
 tree.links.new(rl.outputs["Depth"], out_z.inputs[0])
-
-# render
-scene.frame_current = 1  # 或你想要的 frame 編號
-bpy.ops.render.render(write_still=True)
+if write_index:
+    tree.links.new(rl.outputs["IndexOB"], out_index.inputs[0])
+out_rgb.mute = args.depth_only
+out_index.mute = not write_index
+
+# camera trajectory: every pose becomes one keyframe / one rendered frame
+poses = None
+if args.trajectory:
+    poses = trajectory.load_trajectory(args.trajectory)
+elif args.generate:
+    poses = trajectory.generate(args.generate, args.num_poses, args.seed, args.room, clip_start=cfg["min_depth"])
+
+if poses is None:
+    # single fixed pose -> camera.json
+    poses = [np.array(cam.matrix_world)]
+    frame_start = 1  # 或你想要的 frame 編號
+    camera_file = lambda frame: "camera.json"
+else:
+    # frame numbers stay global so shards of one trajectory never collide
+    frame_start = args.frame_start or 1
+    frame_end = args.frame_end or len(poses)
+    poses = poses[frame_start - 1:frame_end]
+    keyframe_camera(cam, poses, frame_start)
+    # camera_####.json next to rgb_####.png / depth_####.exr
+    camera_file = lambda frame: f"camera_{frame:04d}.json"
+frames = list(range(frame_start, frame_start + len(poses)))
+scene.frame_start, scene.frame_end = frames[0], frames[-1]
+
+if args.benchmark_profiles:
+    scene.frame_set(frames[0])
+    benchmark_profiles(scene, OUT_DIR, args.threads)
+    sys.exit(0)
+
+# resume: frames recorded in the manifest with the same pose, config and
+# unchanged files are skipped; missing, stale or truncated ones are redone
+render_config = {
+    "camera": cfg,
+    "depth_format": depth_format,
+    "engine": scene.render.engine,
+    "profile": RENDER_PROFILES[args.profile],
+    "scene": bpy.data.filepath,
+    "depth_only": args.depth_engine if args.depth_only else None,
+    "gt_classes": None if args.no_gt else sorted(args.gt_classes),
+    "segmentation": segmentation,
+}
+config_hash = render_manifest.hash_config(render_config)
+pose_hashes = [render_manifest.hash_pose(pose) for pose in poses]
+manifest = render_manifest.RenderManifest(OUT_DIR)
+outputs_of = lambda frame: frame_outputs(OUT_DIR, frame, camera_file(frame), args.depth_only,
+                                         not args.no_gt, write_index)
+if args.no_resume:
+    todo = set(frames)
+else:
+    todo = set(manifest.pending(frames, pose_hashes, config_hash, outputs_of))
+print(f"[Resume] {len(frames) - len(todo)}/{len(frames)} frames already rendered")
+
+# intrinsics Blender renders with (lens / sensor / shift); camera.json and GT both use these
+render_intrinsics = depth_raycast.view_intrinsics(cam, scene, cfg["img_w"], cfg["img_h"])
+print(f"[Camera] fx={render_intrinsics[0]:.3f} fy={render_intrinsics[1]:.3f} "
+      f"cx={render_intrinsics[2]:.3f} cy={render_intrinsics[3]:.3f}")
+
+# depth-only with BVH: no render at all, cast the camera rays against the scene
+raycaster = None
+if args.depth_only and args.depth_engine == "bvh" and todo:
+    raycaster = depth_raycast.DepthRaycaster(scene, cam, cfg["img_w"], cfg["img_h"])
+
+# ground truth: object geometry is read once, every frame only adds visibility from its depth map
+gt_exporter = None
+if not args.no_gt and todo:
+    gt_exporter = ground_truth.GroundTruthExporter(scene, args.gt_classes)
+    print(f"[GT] {len(gt_exporter.objects)} labeled objects")
+
+# render: one Blender session for all poses, scene, BVH and textures load once
+for frame, pose_hash in zip(frames, pose_hashes):
+    if frame not in todo:
+        continue
+    scene.frame_set(frame)
+    outputs = outputs_of(frame)
+    if raycaster is not None:
+        if write_index:
+            depth, index = raycaster.render(with_index=True)
+            depth_raycast.save_depth_exr(outputs["index"], index, scene, INDEX_FORMAT)
+        else:
+            depth = raycaster.render()
+        depth_raycast.save_depth_exr(outputs["depth"], depth, scene, depth_format)
+    else:
+        bpy.ops.render.render(write_still=True)
+        depth = None
+    if gt_exporter is not None:
+        if depth is None:
+            depth = depth_raycast.read_depth_exr(outputs["depth"])
+        gt_exporter.export(outputs["gt"], frame, np.array(cam.matrix_world), depth, render_intrinsics)
+    write_camera_json(outputs["camera"], camera_meta(cam, cfg, f, render_intrinsics, segmentation))
+    manifest.record(frame, pose_hash, config_hash, outputs)
+manifest.close()
 print(f"[DONE] 輸出影像到：{OUT_DIR}")
 
-# Calculate ground truth
-# def export_ground_truth(target_object_name):
-#     bboxes_data = {}
-
-#     for obj_name in target_object_name:
-#         if obj_name not in bpy.data.objects:
-#             print(f"[Warning] '{obj_name}'is not found")
-#             continue
-            
-#         obj = bpy.data.objects[obj_name]
-#         class_name = obj_name.split("_")[0]
-#         volumetric_center = list(obj.location)
-#         size = list(obj.dimensions)
-#         yaw = obj.rotation_euler.z
-#         bottom_center_z = volumetric_center[2] - (size[2] / 2.0)
-#         bottom_center = [
-#             volumetric_center[0],
-#             volumetric_center[1],
-#             bottom_center_z
-#         ]
-
-#         bboxes_data[obj_name] = {
-#             "class" : class_name,
-#             "bottom_center": bottom_center,
-#             "size": size,
-#             "heading": yaw,
-#             "volumetric_center": volumetric_center, 
-#         }
-
-#     with open(os.path.join(OUT_DIR, "ground_truth.json"), "w") as f:
-#         json.dump(bboxes_data, f, indent=2)
-
 ## Camera extrinsics
-## Blender camera 前是 -Z、上是 +Y
-## matrix_world 4x4 matrix。
 cam = bpy.context.scene.camera
 
-# Blender camera-to-world
+# Blender camera-to-world (last frame)
 cam2world = np.array(cam.matrix_world)  # 轉 numpy
 world2cam = np.linalg.inv(cam2world) # 外參（OpenCV常用）
-meta = {
-    "width": cfg["img_w"], "height": cfg["img_h"],
-    "fx": cfg["fx"], "fy": cfg["fy"], "cx": cfg["cx"], "cy": cfg["cy"],
-    "sensor_width_mm": cfg["sensor_width"], "sensor_height_mm": cfg["sensor_width"] * cfg["img_h"] / cfg["img_w"],
-    "focal_length_mm": f,
-    "camera_to_world_4x4": cam2world.tolist()
-}
-
-with open(os.path.join(OUT_DIR, "camera.json"), "w", encoding="utf-8") as f:
-    json.dump(meta, f, indent=2)
-
-#TARGET = ["chair", "table", "table_copy"]
-
-#export_ground_truth(TARGET)
 
 print("Camera to World:\n", cam2world.tolist())
 print("World to Camera:\n", world2cam.tolist())
 
-bpy.ops.wm.console_toggle()
+if not bpy.app.background:
+    bpy.ops.wm.console_toggle()
 
@@ -0,0 +1,191 @@
+import argparse
+import os
+import sys
+import time
+
+import bpy
+import numpy as np
+
+# Blender 執行時 sys.path 不含腳本目錄
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.append(SCRIPT_DIR)
+import room_spec
+
+# 8 corners / 6 quads of a box spanning [0, 1]^3
+_BOX_CORNERS = np.array([
+    [0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0],
+    [0, 0, 1], [1, 0, 1], [1, 1, 1], [0, 1, 1],
+], dtype=np.float64)
+_BOX_FACES = np.array([
+    [0, 3, 2, 1], [4, 5, 6, 7],
+    [0, 1, 5, 4], [1, 2, 6, 5], [2, 3, 7, 6], [3, 0, 4, 7],
+], dtype=np.int64)
+
+
+def boxes_mesh_data(boxes):
+    """boxes: (N, 6) [x0, y0, z0, x1, y1, z1] -> vertices (8N, 3), quads (6N, 4)"""
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 6)
+    lo, size = boxes[:, None, :3], boxes[:, None, 3:] - boxes[:, None, :3]
+    verts = lo + _BOX_CORNERS[None] * size
+    faces = _BOX_FACES[None] + 8 * np.arange(len(boxes))[:, None, None]
+    return verts.reshape(-1, 3), faces.reshape(-1, 4)
+
+
+def wall_boxes(length, height, thickness, openings=(), start_pad=0.0):
+    """
+    一面牆 (局部座標：x 沿牆、y 為厚度、z 由牆底往上) 切成不重疊的方塊，
+    開口處留空，不需要 Boolean。
+    openings: [(x0, x1, z0, z1)]，x 從牆的起點 (不含 start_pad) 量起
+    """
+    half_t = thickness / 2
+    x_start, x_end = -length / 2, length / 2
+    boxes, cursor = [], x_start
+    for x0, x1, z0, z1 in sorted(openings):
+        x0 = max(x_start, x_start + start_pad + x0)
+        x1 = min(x_end, x_start + start_pad + x1)
+        z0, z1 = max(0.0, z0), min(height, z1)
+        if x1 <= x0 or z1 <= z0:
+            continue
+        if x0 > cursor:
+            boxes.append([cursor, -half_t, 0, x0, half_t, height])
+        if z0 > 0:
+            boxes.append([x0, -half_t, 0, x1, half_t, z0])
+        if z1 < height:
+            boxes.append([x0, -half_t, z1, x1, half_t, height])
+        cursor = max(cursor, x1)
+    if cursor < x_end:
+        boxes.append([cursor, -half_t, 0, x_end, half_t, height])
+    return boxes
+
+
+def new_mesh(name, verts, faces):
+    mesh = bpy.data.meshes.new(name)
+    mesh.from_pydata(np.asarray(verts).tolist(), [], np.asarray(faces).tolist())
+    mesh.update()
+    return mesh
+
+
+def polygon_mesh(name, footprint, z, flip=False, uv_tile_size=None):
+    """Flat n-gon (floor / ceiling) with a UV map"""
+    xy = np.asarray(footprint, dtype=np.float64)
+    verts = np.column_stack([xy, np.full(len(xy), z)])
+    face = list(range(len(xy)))
+    if flip:  # ceiling faces down
+        face.reverse()
+    mesh = new_mesh(name, verts, [face])
+
+    # planar UV: whole polygon = one texture (like the stretched plane), or tiled
+    lo, hi = xy.min(axis=0), xy.max(axis=0)
+    scale = (hi - lo) if uv_tile_size is None else np.full(2, uv_tile_size)
+    uv_layer = mesh.uv_layers.new(name="UVMap")
+    loop_verts = np.empty(len(mesh.loops), dtype=np.int64)
+    mesh.loops.foreach_get("vertex_index", loop_verts)
+    uv_layer.data.foreach_set("uv", ((xy[loop_verts] - lo) / scale).ravel())
+    return mesh
+
+
+class RoomBuilder:
+    """Compiles a room spec straight into mesh datablocks (no bpy.ops)
+
+    Walls with the same length / height / thickness / openings share one
+    mesh datablock, the way Wall1_copy1 reuses Wall1.data.
+    """
+
+    def __init__(self, materials, collection=None):
+        """materials: {"floor": mat, "walls": mat, "ceiling": mat}"""
+        self.materials = materials
+        self.collection = collection or bpy.context.scene.collection
+        self.wall_meshes = {}
+
+    def _link(self, name, mesh):
+        obj = bpy.data.objects.new(name, mesh)
+        self.collection.objects.link(obj)
+        return obj
+
+    def wall_mesh(self, wall):
+        key = (round(wall["length"], 4), round(wall["height"], 4), round(wall["thickness"], 4),
+               wall["pad"], wall["openings"])
+        mesh = self.wall_meshes.get(key)
+        if mesh is None:
+            boxes = wall_boxes(wall["length"], wall["height"], wall["thickness"],
+                               wall["openings"], wall["pad"])
+            mesh = new_mesh(f"{wall['name']}_mesh", *boxes_mesh_data(boxes))
+            if self.materials.get("walls"):
+                mesh.materials.append(self.materials["walls"])
+            self.wall_meshes[key] = mesh
+        return mesh
+
+    def build(self, room, prefix=""):
+        """Create floor, ceiling and all walls, returns the new objects"""
+        objects = []
+
+        floor = self._link(f"{prefix}Floor",
+                           polygon_mesh(f"{prefix}Floor", room["footprint"], room["floor_z"],
+                                        uv_tile_size=room["uv_tile_size"]))
+        ceiling = self._link(f"{prefix}Ceiling",
+                             polygon_mesh(f"{prefix}Ceiling", room["footprint"], room["ceiling_z"],
+                                          flip=True, uv_tile_size=room["uv_tile_size"]))
+        for obj, role in ((floor, "floor"), (ceiling, "ceiling")):
+            if self.materials.get(role):
+                obj.data.materials.append(self.materials[role])
+            objects.append(obj)
+
+        for wall in room_spec.room_walls(room):
+            obj = self._link(f"{prefix}{wall['name']}", self.wall_mesh(wall))
+            obj.location = (wall["center"][0], wall["center"][1], room["wall_base"])
+            obj.rotation_euler = (0, 0, wall["yaw"])
+            objects.append(obj)
+        return objects
+
+
+def _ops_walls(room, collection):
+    """Reference: one primitive_cube_add + scale per wall, like the hard-coded scene_setup.py"""
+    objects = []
+    for wall in room_spec.room_walls(room):
+        bpy.ops.mesh.primitive_cube_add(size=1)
+        obj = bpy.context.active_object
+        for users in obj.users_collection:
+            users.objects.unlink(obj)
+        collection.objects.link(obj)
+        obj.name = wall["name"]
+        obj.scale = (wall["length"], wall["thickness"], wall["height"])
+        obj.location = (wall["center"][0], wall["center"][1], room["wall_base"] + wall["height"] / 2)
+        obj.rotation_euler = (0, 0, wall["yaw"])
+        objects.append(obj)
+    return objects
+
+
+def benchmark(spec_path, repeats=20):
+    """ms per room build: RoomBuilder vs bpy.ops walls, objects and meshes removed after every run"""
+    room = room_spec.load_room_spec(spec_path)
+    collection = bpy.data.collections.new("room_benchmark")
+    bpy.context.scene.collection.children.link(collection)
+    builds = {"RoomBuilder": lambda: RoomBuilder({}, collection).build(room),
+              "bpy.ops walls": lambda: _ops_walls(room, collection)}
+    try:
+        for label, build in builds.items():
+            seconds = 0.0
+            for _ in range(repeats):
+                start = time.perf_counter()
+                objects = build()
+                bpy.context.view_layer.update()
+                seconds += time.perf_counter() - start
+                meshes = {obj.data for obj in objects}
+                for obj in objects:
+                    bpy.data.objects.remove(obj)
+                for mesh in meshes:
+                    bpy.data.meshes.remove(mesh)
+            print(f"[Room] {label}: {seconds / repeats * 1000:.1f} ms, {len(objects)} objects")
+    finally:
+        bpy.data.collections.remove(collection)
+
+
+if __name__ == "__main__":
+    # blender -b --python room_builder.py -- rooms/cvrlab.json
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(description="Benchmark building a room spec")
+    parser.add_argument("spec", nargs="?", default=os.path.join(SCRIPT_DIR, "rooms", "cvrlab.json"))
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args(argv)
+    benchmark(args.spec, args.repeats)
@@ -0,0 +1,94 @@
+"""Room specs (rooms/*.json) and their wall geometry
+
+NumPy only: room_builder.py builds the meshes from room_walls() inside
+Blender, layout_engine.py and trajectory.py test furniture and cameras
+against the same walls outside Blender.
+"""
+import json
+import math
+
+import numpy as np
+
+ROOM_DEFAULTS = {
+    "floor_z": 0.0,
+    "ceiling_z": 3.8,
+    "wall_base": 0.0,
+    "wall_height": 4.0,
+    "wall_thickness": 0.3,
+    "outer_walls": [],
+    "openings": [],
+    "interior_walls": [],
+    "uv_tile_size": None,
+}
+
+
+def load_room_spec(path):
+    """
+    讀取房間描述 (JSON)：
+    footprint : [[x, y], ...] 地板多邊形 (逆時針)，每條邊是一面外牆
+    floor_z, ceiling_z : 地板 / 天花板高度
+    wall_base, wall_height, wall_thickness : 牆底高度、牆高、牆厚
+    outer_walls : [{"name", "offset", "pad"}] 第 i 條邊的外牆 (可省略)：
+                  offset 牆中線往外移 (m)，pad 兩端延長 (預設半個牆厚，封住轉角)
+    openings : [{"wall": i, "offset", "width", "bottom", "height"}] 外牆 i 上的門窗，
+               offset 從該邊起點量到開口左緣，bottom 從地板量起
+    interior_walls : [{"name", "start": [x, y], "end": [x, y], "thickness", "height", "openings"}]
+    uv_tile_size : 地板/天花板貼圖每格大小 (m)，null = 整面拉伸一張
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        spec = json.load(f)
+    room = dict(ROOM_DEFAULTS)
+    room.update(spec)
+    if len(room.get("footprint", [])) < 3:
+        raise ValueError(f"Room spec '{path}' needs a footprint polygon with at least 3 points")
+    return room
+
+
+def room_walls(room):
+    """Every wall of the room as a dict(name, start, end, pad, center, yaw, length, height, thickness, openings)
+
+    Outer walls come first, one per footprint edge, then the interior walls.
+    """
+    walls = []
+    footprint = np.asarray(room["footprint"], dtype=np.float64)
+    thickness, height = room["wall_thickness"], room["wall_height"]
+    lift = room["floor_z"] - room["wall_base"]  # opening heights are measured from the floor
+    x, y = footprint[:, 0], footprint[:, 1]
+    clockwise = np.sum(x * np.roll(y, -1) - np.roll(x, -1) * y) < 0
+
+    def opening_list(openings):
+        return tuple((o["offset"], o["offset"] + o["width"],
+                      lift + o.get("bottom", 0.0), lift + o.get("bottom", 0.0) + o["height"])
+                     for o in openings)
+
+    for i in range(len(footprint)):
+        start, end = footprint[i], footprint[(i + 1) % len(footprint)]
+        outer = room["outer_walls"][i] if i < len(room["outer_walls"]) else {}
+        delta = (end - start) / np.hypot(*(end - start))
+        outward = np.array([delta[1], -delta[0]]) * (-1 if clockwise else 1)
+        shift = outward * outer.get("offset", 0.0)
+        walls.append({
+            "name": outer.get("name", f"Wall_{i}"),
+            "start": start + shift, "end": end + shift,
+            # outer walls overlap by half a thickness to close the corners
+            "pad": outer.get("pad", thickness / 2),
+            "height": height, "thickness": thickness,
+            "openings": opening_list([o for o in room["openings"] if o["wall"] == i]),
+        })
+    for j, w in enumerate(room["interior_walls"]):
+        walls.append({
+            "name": w.get("name", f"InteriorWall_{j}"),
+            "start": np.asarray(w["start"], dtype=np.float64),
+            "end": np.asarray(w["end"], dtype=np.float64),
+            "pad": 0.0,
+            "height": w.get("height", height),
+            "thickness": w.get("thickness", thickness),
+            "openings": opening_list(w.get("openings", [])),
+        })
+
+    for w in walls:
+        delta = w["end"] - w["start"]
+        w["length"] = float(np.hypot(*delta)) + 2 * w["pad"]
+        w["center"] = (w["start"] + w["end"]) / 2
+        w["yaw"] = math.atan2(delta[1], delta[0])
+    return walls
@@ -1,14 +1,33 @@
+import os
+import sys
+import time
+
 import bpy
 import numpy as np
-import bmesh
+
+# Blender 執行時 sys.path 不含腳本目錄
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.append(SCRIPT_DIR)
+import camera_config
+import material_library
+import room_builder
+import room_spec
+import texture_cache
+
+ROOM_SPEC = os.path.join(SCRIPT_DIR, "rooms", "cvrlab.json")
+
+# 貼圖解析度：None = 原圖，512/1024/2048 = 固定 tier，"auto" = 依輸出解析度與相機距離挑選
+# (tier 需先用 texture_cache.py 建立快取，沒有快取時自動退回原圖)
+TEXTURE_TIER = "auto"
+CAMERA_HEIGHT = 1.4           # trajectory.generate 的預設高度
+CAMERA_HFOV = camera_config.render_hfov(camera_config.L515)  # render_scene.py 相機的水平視角 (= L515 fov_h, 約 55.36°)
 
 def add_texture_node(nodes, path, colorspace='sRGB'):
     """添加 Image Texture 節點並載入圖片"""
     tex_node = nodes.new("ShaderNodeTexImage")
     try:
-        img = bpy.data.images.load(path)
-        tex_node.image = img
-        tex_node.image.colorspace_settings.name = colorspace
+        tex_node.image = material_library.load_image(path, colorspace)
     except RuntimeError:
         print(f"Warning: Could not load image at {path}. Check file path.")
         # 可以設置為紅色或其他顏色來提示缺失紋理
@@ -17,10 +36,24 @@ def add_texture_node(nodes, path, colorspace='sRGB'):
 
 def setup_principled_material(name, base_color_path=None, roughness_path=None, 
                              normal_path=None, displacement_path=None, 
-                             normal_strength=0.8, displacement_strength=1.0):
+                             normal_strength=0.8, displacement_strength=1.0, texture_tier=None):
     """
     建立一個 Principled BSDF 材質，並根據提供的路徑連接紋理。
+    參數相同的材質只建立一次 (見 material_library)。
+    texture_tier: 使用 texture_cache 中該解析度的貼圖 (None = 原圖)
     """
+    if texture_tier is not None:
+        base_color_path, roughness_path, normal_path, displacement_path = [
+            p and texture_cache.resolve(bpy.path.abspath(p), texture_tier)
+            for p in (base_color_path, roughness_path, normal_path, displacement_path)]
+    param_hash = material_library.material_hash(
+        base_color_path=base_color_path, roughness_path=roughness_path,
+        normal_path=normal_path, displacement_path=displacement_path,
+        normal_strength=normal_strength, displacement_strength=displacement_strength)
+    mat = material_library.find_material(param_hash)
+    if mat is not None:
+        return mat
+
     mat = bpy.data.materials.new(name=name)
     mat.use_nodes = True
     nodes = mat.node_tree.nodes
@@ -70,74 +103,41 @@ def setup_principled_material(name, base_color_path=None, roughness_path=None,
         mat.cycles.displacement_method = 'DISPLACEMENT_AND_BUMP'
         tex_disp.location = (-600, -150)
         disp_node.location = (0, -150)
-        
-    return mat
 
-def transformation(obj, location=None, scale=None, rotation_euler=None):
-    """應用物體的變換"""
-    if scale:
-        obj.scale = scale
-    if rotation_euler:
-        obj.rotation_euler = rotation_euler
-    if location:
-        obj.location = location
+    return material_library.register_material(mat, param_hash)
 
-def stretch_object_from_side(obj, axis, direction, new_position):
-    """
-    拉伸物體的指定側到新的位置。
-    obj: 要拉伸的物體
-    axis: 0=X, 1=Y, 2=Z
-    direction: 1 (正向) 或 -1 (負向)
-    new_position: 該側的新坐標
-    """
-    if obj.mode != 'OBJECT':
-        bpy.ops.object.mode_set(mode='OBJECT')
-
-    # 選中物體並進入編輯模式
-    bpy.context.view_layer.objects.active = obj
-    bpy.ops.object.mode_set(mode='EDIT')
-    
-    bm = bmesh.from_edit_mesh(obj.data)
-    bm.verts.ensure_lookup_table() # 確保頂點索引可查找
-    
-    epsilon = 1e-5 
-    
-    coords = [v.co[axis] for v in bm.verts]
-    
-    if direction > 0:
-        boundary_value = max(coords)
-    else:
-        boundary_value = min(coords)
-        
-    verts_to_move = []
-    for v in bm.verts:
-        if abs(v.co[axis] - boundary_value) < epsilon:
-            verts_to_move.append(v)
-            
-    move_distance = new_position - boundary_value
-    
-    move_vector = [0, 0, 0]
-    move_vector[axis] = move_distance
-    
-    bmesh.ops.translate(bm,
-                        verts=verts_to_move,
-                        vec=move_vector)
-                        
-    bmesh.update_edit_mesh(obj.data)
-    bm.free()
-
-    bpy.ops.object.mode_set(mode='OBJECT')    
+def surface_texture_tier(distance, surface_size):
+    """TEXTURE_TIER == "auto" 時，依目前的輸出寬度、相機到表面的距離與貼圖覆蓋範圍挑 tier"""
+    if TEXTURE_TIER != "auto":
+        return TEXTURE_TIER
+    render = bpy.context.scene.render
+    width = render.resolution_x * render.resolution_percentage / 100
+    return texture_cache.pick_tier(width, CAMERA_HFOV, distance, surface_size)
 
-def apply_stretches(obj, stretches):
-    """應用一系列的拉伸操作"""
-    for axis, direction, position in stretches:
-        stretch_object_from_side(obj, axis, direction, position)
+def setup_color_material(name, color, roughness=0.5):
+    """單色 Principled BSDF 材質 (同樣經過材質快取)"""
+    param_hash = material_library.material_hash(color=list(color), roughness=roughness)
+    mat = material_library.find_material(param_hash)
+    if mat is not None:
+        return mat
 
-# ====== Build floor ======
-bpy.ops.mesh.primitive_plane_add(size=3, location=(0, 0, 0))
-floor = bpy.context.active_object
-floor.name = "Floor"
-floor.scale = (1, 1, 0.005)
+    mat = bpy.data.materials.new(name=name)
+    mat.use_nodes = True
+    bsdf = mat.node_tree.nodes["Principled BSDF"]
+    bsdf.inputs["Base Color"].default_value = color
+    bsdf.inputs["Roughness"].default_value = roughness
+    return material_library.register_material(mat, param_hash)
+
+# ====== Build room ======
+# 地板 / 牆 / 天花板由 rooms/*.json 描述，room_builder 直接建立 mesh (不用 bpy.ops)
+room = room_spec.load_room_spec(ROOM_SPEC)
+
+# 一張貼圖在地板/天花板上覆蓋的範圍 (uv_tile_size 為 null 時整面一張)
+footprint = np.asarray(room["footprint"])
+texture_extent = room["uv_tile_size"] or float((footprint.max(axis=0) - footprint.min(axis=0)).max())
+floor_tier = surface_texture_tier(CAMERA_HEIGHT - room["floor_z"], texture_extent)
+ceiling_tier = surface_texture_tier(room["ceiling_z"] - CAMERA_HEIGHT, texture_extent)
+print(f"[Textures] floor tier {floor_tier or 'original'}, ceiling tier {ceiling_tier or 'original'}")
 
 # 建立地板材質
 floor_mat = setup_principled_material(
@@ -146,76 +146,12 @@ floor_mat = setup_principled_material(
     roughness_path="//../texture/Wood092_1K-JPG/Wood092_1K-JPG_Roughness.jpg",
     normal_path="//../texture/Wood092_1K-JPG/Wood092_1K-JPG_NormalGL.jpg",
     displacement_path="//../texture/Wood092_1K-JPG/Wood092_1K-JPG_Displacement.jpg",
-    normal_strength=0.8
+    normal_strength=0.8,
+    texture_tier=floor_tier
 )
-floor.data.materials.append(floor_mat)
-
-# 地板拉伸
-floor_stretches = [
-    (0, -1, -6.8), # X軸負方向
-    (0, 1, 6),   # X軸正方向
-    (1, -1, -6.4),    # Y軸負方向
-    (1, 1, 3.4)
-]
-apply_stretches(floor, floor_stretches)
-
-# ====== Build walls ======
 
 # 統一牆壁材質
-wall_mat_white = bpy.data.materials.new(name="WhiteWall")
-wall_mat_white.use_nodes = True
-bsdf = wall_mat_white.node_tree.nodes["Principled BSDF"]
-bsdf.inputs["Base Color"].default_value = (1, 1, 1, 1)
-bsdf.inputs["Roughness"].default_value = 0.9
-
-# 牆壁數據
-walls_data = [
-    {"name": "Wall1", "location": (6, -1.5, 1.75), "rotation_euler": (0, 0, np.deg2rad(90)), "scale": (9.8/3, 0.1, 4/3)},
-    {"name": "Wall1_copy1", "location": (-6.8, -1.5, 1.75), "rotation_euler": (0, 0, np.deg2rad(90)), "base_obj_name": "Wall1"},
-    {"name": "Wall2", "location": (-0.4, 3.5, 1.75), "rotation_euler": (0, 0, np.deg2rad(0)), "scale": (12.93/3, 0.1, 4/3)},
-    {"name": "Wall2_copy1", "location": (-0.4, -6.5, 1.75), "rotation_euler": (0, 0, np.deg2rad(0)), "base_obj_name": "Wall2"}, # 從 Wall2 複製的
-    {"name": "Wall3", "location": (1.32, -2.91, 1.75), "rotation_euler": (0, 0, np.deg2rad(90)), "scale": (6.98/3, 0.1, 4/3) },
-    {"name": "Wall4", "location": (3.725, 0.58, 1.75), "rotation_euler": (0, 0, np.deg2rad(0)), "scale": (4.81/3, 0.1, 4/3)},
-    {"name": "Wall4_copy1", "location": (3.725, -3.09, 1.75), "base_obj_name": "Wall4"}, # 從 Wall4 複製的
-    {"name": "Wall5", "location": (-1.945, 0.335, 1.75), "rotation_euler": (0, 0, np.deg2rad(0)), "scale": (0.41/3, 0.41/3, 4/3)}
-]
-
-for wall_info in walls_data:
-    obj_name = wall_info["name"]
-    base_obj = None
-
-    if "base_obj_name" in wall_info: # 這是複製的牆壁
-        base_obj = bpy.data.objects.get(wall_info["base_obj_name"])
-        if base_obj:
-            new_wall = base_obj.copy()
-            new_wall.data = base_obj.data # 鏈接數據塊，而非複製
-            bpy.context.collection.objects.link(new_wall)
-            new_wall.name = obj_name
-        else:
-            print(f"Warning: Base object '{wall_info['base_obj_name']}' not found for '{obj_name}'. Skipping.")
-            continue
-    else: # 這是新創建的牆壁
-        bpy.ops.mesh.primitive_cube_add(size=3) # 初始大小無關緊要，因為會被 scale 覆蓋
-        new_wall = bpy.context.active_object
-        new_wall.name = obj_name
-        new_wall.data.materials.append(wall_mat_white)
-
-    transformation(
-        new_wall, 
-        location=wall_info.get("location"),
-        scale=wall_info.get("scale"),
-        rotation_euler=wall_info.get("rotation_euler")
-    )
-
-    if "stretches" in wall_info:
-        apply_stretches(new_wall, wall_info["stretches"])
-
-
-# ====== Build ceiling ======
-bpy.ops.mesh.primitive_plane_add(size=3, location=(0, 0, 3.8))
-ceiling = bpy.context.active_object
-ceiling.name = "Ceiling"
-ceiling.scale = (1, 1, 0.05) 
+wall_mat_white = setup_color_material("WhiteWall", (1, 1, 1, 1), roughness=0.9)
 
 # 建立天花板材質
 ceiling_mat = setup_principled_material(
@@ -224,36 +160,13 @@ ceiling_mat = setup_principled_material(
     roughness_path="//../texture/OfficeCeiling001_4K-JPG/OfficeCeiling001_4K_Roughness.jpg",
     normal_path="//../texture/OfficeCeiling001_4K-JPG/OfficeCeiling001_4K_NormalGL.jpg",
     displacement_path="//../texture/OfficeCeiling001_4K-JPG/OfficeCeiling001_4K_Displacement.jpg",
-    normal_strength=0.8
+    normal_strength=0.8,
+    texture_tier=ceiling_tier
 )
-ceiling.data.materials.append(ceiling_mat)
-
-# 天花板拉伸
-ceiling_stretches = [
-    (0, -1, -6.8), # X軸負方向
-    (0, 1, 6),   # X軸正方向
-    (1, -1, -6.4),    # Y軸負方向
-    (1, 1, 3.4)
-]
-apply_stretches(ceiling, ceiling_stretches)
-
-## ====== Build door ======
-#def build_door(wall, location, scale):
-#    bpy.ops.mesh.primitive_cube_add(size=2, location=location)
-#    door_hole = bpy.context.active_object
-#    door_hole.name = "DoorHole"
-#    door_hole.scale = scale
-#    bool_mod = wall.modifiers.new(name="DoorBoolean", type='BOOLEAN')
-#    bool_mod.operation = 'DIFFERENCE'
-#    bool_mod.object = door_hole
-#    wall.data=wall.data.copy()
-#    bpy.context.view_layer.objects.active = wall
-#    bpy.ops.object.modifier_apply(modifier=bool_mod.name)
 
-#    bpy.data.objects.remove(door_hole, do_unlink=True)
-#    
-#wall = bpy.data.objects.get("Wall1")
-#build_door(wall, location=(5, 1.5, 1), scale=(1, 0.8, 1))
-#wall = bpy.data.objects.get("Wall3")
-#build_door(wall, location=(-3, -3, 1), scale=(0.5, 0.5, 1))
-#build_door(wall, location=(-1, -3, 1), scale=(0.5, 0.5, 1))
\ No newline at end of file
+start = time.perf_counter()
+builder = room_builder.RoomBuilder({"floor": floor_mat, "walls": wall_mat_white, "ceiling": ceiling_mat})
+room_objects = builder.build(room)
+print(f"[Room] {room.get('name', ROOM_SPEC)}: {len(room_objects)} objects, "
+      f"{len(builder.wall_meshes)} wall meshes in {(time.perf_counter() - start) * 1000:.1f} ms")
+material_library.report()
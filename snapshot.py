@@ -0,0 +1,208 @@
+import argparse
+import os
+
+import cv2
+import numpy as np
+import open3d as o3d
+
+import visualizer
+
+# (azimuth, elevation) in degrees around the cloud center, +Z is up
+DEFAULT_VIEWS = [(-90, 30), (0, 30), (90, 30), (0, 89)]
+
+
+def look_at(center, azimuth, elevation, radius):
+    """eye position and camera basis (right, up, forward) for one viewpoint"""
+    az, el = np.deg2rad(azimuth), np.deg2rad(elevation)
+    direction = np.array([np.cos(el) * np.cos(az), np.cos(el) * np.sin(az), np.sin(el)])
+    eye = center + radius * direction
+    forward = -direction
+    right = np.cross(forward, [0, 0, 1])
+    if np.linalg.norm(right) < 1e-6:  # looking straight down
+        right = np.array([1.0, 0.0, 0.0])
+    right /= np.linalg.norm(right)
+    up = np.cross(right, forward)
+    return eye, right, up, forward
+
+
+def bbox_edge_points(bboxes, colors, samples=128):
+    """Sample points along every bbox edge so the splatter can draw them"""
+    corners = visualizer.bbox_corners(bboxes)                      # (N, 8, 3)
+    edges = corners[:, visualizer.BBOX_EDGES]                       # (N, 12, 2, 3)
+    t = np.linspace(0, 1, samples)[None, None, :, None]
+    pts = edges[:, :, None, 0] * (1 - t) + edges[:, :, None, 1] * t  # (N, 12, S, 3)
+    cols = np.broadcast_to(np.asarray(colors, dtype=np.float64)[:, None, None, :], pts.shape)
+    return pts.reshape(-1, 3), cols.reshape(-1, 3)
+
+
+class Snapshotter:
+    """Off-screen PNG snapshots of point clouds (+ bbox wireframes)
+
+    backend: "open3d" uses Open3D's OffscreenRenderer (needs EGL/GPU),
+             "numpy" uses a z-buffer point splatter that runs anywhere,
+             "auto" tries Open3D once and falls back to NumPy.
+    One Snapshotter is meant to be reused for many scenes.
+    """
+
+    def __init__(self, width=320, height=240, views=DEFAULT_VIEWS, backend="auto",
+                 fov=45.0, point_size=2, background=(255, 255, 255)):
+        if backend not in ("auto", "open3d", "numpy"):
+            raise ValueError(f"Unknown backend '{backend}'")
+        self.width, self.height = width, height
+        self.views = list(views)
+        self.fov = fov
+        self.point_size = point_size
+        self.background = np.array(background, dtype=np.uint8)
+        self.backend = backend
+        self._renderer = None
+        if backend in ("auto", "open3d"):
+            try:
+                self._renderer = o3d.visualization.rendering.OffscreenRenderer(width, height)
+                self.backend = "open3d"
+            except Exception:
+                if backend == "open3d":
+                    raise
+                self.backend = "numpy"
+
+    @property
+    def focal(self):
+        """focal length in pixels, fov is the vertical field of view"""
+        return (self.height / 2) / np.tan(np.deg2rad(self.fov) / 2)
+
+    def blank(self):
+        image = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        image[:] = self.background
+        return image
+
+    def _framing(self, xyz):
+        lo, hi = xyz.min(axis=0), xyz.max(axis=0)
+        center = (lo + hi) / 2
+        extent = max(np.linalg.norm(hi - lo) / 2, 1e-3)
+        # fit the bounding sphere into the narrower image side
+        half_angle = np.arctan((min(self.width, self.height) / 2) / self.focal)
+        radius = extent / np.sin(half_angle)
+        return center, radius
+
+    def _splat(self, xyz, rgb, eye, right, up, forward):
+        rel = xyz - eye
+        z = rel @ forward
+        front = z > 1e-6
+        rel, z, rgb = rel[front], z[front], rgb[front]
+
+        f = self.focal
+        u = np.round(f * (rel @ right) / z + self.width / 2).astype(np.int64)
+        v = np.round(-f * (rel @ up) / z + self.height / 2).astype(np.int64)
+
+        # far to near: the nearest point is written last and wins
+        order = np.argsort(-z, kind="stable")
+        u, v, colors = u[order], v[order], rgb[order]
+
+        image = self.blank()
+        r = self.point_size // 2
+        for du in range(-r, self.point_size - r):
+            for dv in range(-r, self.point_size - r):
+                uu, vv = u + du, v + dv
+                inside = (uu >= 0) & (uu < self.width) & (vv >= 0) & (vv < self.height)
+                image[vv[inside], uu[inside]] = colors[inside]
+        return image
+
+    def _render_open3d(self, xyz, rgb, bboxes, box_colors, center, radius):
+        scene = self._renderer.scene
+        scene.clear_geometry()
+        scene.set_background(np.append(self.background / 255.0, 1.0))
+
+        pcd = o3d.geometry.PointCloud(o3d.utility.Vector3dVector(xyz))
+        pcd.colors = o3d.utility.Vector3dVector(rgb / 255.0)
+        material = o3d.visualization.rendering.MaterialRecord()
+        material.shader = "defaultUnlit"
+        material.point_size = self.point_size
+        scene.add_geometry("cloud", pcd, material)
+
+        if bboxes is not None and len(bboxes):
+            lineset = visualizer.bbox_lineset(bboxes, box_colors)
+            line_material = o3d.visualization.rendering.MaterialRecord()
+            line_material.shader = "unlitLine"
+            line_material.line_width = 2
+            scene.add_geometry("bboxes", lineset, line_material)
+
+        images = []
+        for azimuth, elevation in self.views:
+            eye, _, up, _ = look_at(center, azimuth, elevation, radius)
+            self._renderer.setup_camera(self.fov, center, eye, up)
+            images.append(np.asarray(self._renderer.render_to_image()))
+        return images
+
+    def render(self, xyz, rgb, bboxes=None, box_colors=None):
+        """One RGB uint8 image per view
+
+        xyz: (N, 3); rgb: (N, 3) uint8 or float in [0, 1]
+        bboxes: optional (M, 7) [x, y, z, dx, dy, dz, heading]
+        """
+        xyz = np.asarray(xyz, dtype=np.float64).reshape(-1, 3)
+        rgb = np.asarray(rgb).reshape(-1, 3)
+        if rgb.dtype != np.uint8:
+            rgb = np.clip(rgb * 255.0, 0, 255).astype(np.uint8)
+        if bboxes is not None:
+            bboxes = np.asarray(bboxes, dtype=np.float64).reshape(-1, 7)
+            if box_colors is None:
+                box_colors = np.tile([1.0, 0.0, 0.0], (len(bboxes), 1))
+        # frame the boxes too; nothing at all (empty frame in a batch) -> blank views
+        framed = xyz
+        if bboxes is not None and len(bboxes):
+            framed = np.concatenate([xyz, visualizer.bbox_corners(bboxes).reshape(-1, 3)])
+        if len(framed) == 0:
+            return [self.blank() for _ in self.views]
+        center, radius = self._framing(framed)
+
+        if self.backend == "open3d":
+            return self._render_open3d(xyz, rgb, bboxes, box_colors, center, radius)
+
+        if bboxes is not None and len(bboxes):
+            line_xyz, line_rgb = bbox_edge_points(bboxes, box_colors)
+            xyz = np.concatenate([xyz, line_xyz])
+            rgb = np.concatenate([rgb, (line_rgb * 255).astype(np.uint8)])
+        return [self._splat(xyz, rgb, *look_at(center, az, el, radius)) for az, el in self.views]
+
+    def contact_sheet(self, images, cols=None):
+        """Tile equally sized images into one grid image"""
+        cols = cols or len(self.views)
+        rows = -(-len(images) // cols)
+        sheet = np.empty((rows * self.height, cols * self.width, 3), dtype=np.uint8)
+        sheet[:] = self.background
+        for i, image in enumerate(images):
+            r, c = divmod(i, cols)
+            sheet[r * self.height:(r + 1) * self.height, c * self.width:(c + 1) * self.width] = image
+        return sheet
+
+
+def save_png(path, image):
+    cv2.imwrite(path, cv2.cvtColor(image, cv2.COLOR_RGB2BGR))
+
+
+def snapshot_files(cloud_files, out_dir, snapshotter=None):
+    """Batch QA: one contact sheet (all views of a scene) per point cloud file"""
+    snapshotter = snapshotter or Snapshotter()
+    vis = visualizer.Visualizer()
+    os.makedirs(out_dir, exist_ok=True)
+    outputs = []
+    for cloud_file in cloud_files:
+        pcd = vis.read_point_cloud(cloud_file)
+        images = snapshotter.render(vis.get_xyz(pcd), vis.get_colors(pcd))
+        name = os.path.splitext(os.path.basename(cloud_file))[0]
+        path = os.path.join(out_dir, f"{name}.png")
+        save_png(path, snapshotter.contact_sheet(images))
+        outputs.append(path)
+    return outputs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render point clouds to PNG contact sheets without a window")
+    parser.add_argument("clouds", nargs="+", help="point cloud files (.ply, .pcd ...)")
+    parser.add_argument("--out-dir", default=os.path.join("tmp", "qa"))
+    parser.add_argument("--width", type=int, default=320)
+    parser.add_argument("--height", type=int, default=240)
+    parser.add_argument("--backend", default="auto", choices=["auto", "open3d", "numpy"])
+    args = parser.parse_args()
+    snap = Snapshotter(args.width, args.height, backend=args.backend)
+    outputs = snapshot_files(args.clouds, args.out_dir, snap)
+    print(f"[DONE] {len(outputs)} snapshots ({snap.backend}) -> {args.out_dir}")
@@ -3,15 +3,9 @@ import open3d as o3d
 import json
 import visualizer
 
-COLOR_TABLE = {
-    "table": (0.0, 1.0, 0.0),  # 綠色
-    "chair": (0.0, 0.5, 1.0),  # 藍色
-    # 您可以在這裡加入更多類別...
-    # "sofa": (1.0, 0.0, 0.0), # 紅色
-    "default": (0.5, 0.5, 0.5) # 灰色
-}
-
-input_path = r"tmp\scene_output\colored_point_cloud.ply"
+COLOR_TABLE = visualizer.COLOR_TABLE
+
+input_path = r"tmp\scene_output\colored_point_cloud_0001.ply"
 input_path_gt = r"tmp\blender_output\ground_truth.json"
 
 vis = visualizer.Visualizer()
@@ -0,0 +1,29 @@
+import numpy as np
+
+import depth_noise
+
+
+def step_depth(width=64, height=48):
+    depth = np.full((height, width), 2.0, dtype=np.float32)
+    depth[:, width // 2:] = 3.0
+    return depth
+
+
+def test_flying_pixels_are_removed_beyond_grazing_dropout():
+    depth = step_depth()
+    out = depth_noise.DepthNoise(64, 48, 610, 610, sigma0=0, sigma_k=0).apply(depth)
+    # jump between columns 31 and 32, edge_radius 1 -> columns 30..33 dropped
+    assert (out[:, 30:34] == 0).all()
+    assert (out[:, :30] != 0).all() and (out[:, 34:] != 0).all()
+
+    no_edges = depth_noise.DepthNoise(64, 48, 610, 610, sigma0=0, sigma_k=0, edge_threshold=1e6).apply(depth)
+    assert (no_edges == 0).sum() < (out == 0).sum()
+
+
+def test_frames_draw_fresh_noise_by_default():
+    noise = depth_noise.DepthNoise(64, 48, 610, 610)
+    assert noise.pool_size == 0
+    depth = np.full((48, 64), 2.0, dtype=np.float32)
+    a, b = noise.apply(depth, 0), noise.apply(depth, 1)
+    assert not np.array_equal(a, b)
+    np.testing.assert_array_equal(a, noise.apply(depth, 0))
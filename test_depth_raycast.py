@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+bpy = pytest.importorskip("bpy")
+import depth_raycast  # noqa: E402
+
+WIDTH, HEIGHT = 64, 48
+
+
+def add_box(scene, name, lo, hi, pass_index):
+    (x0, y0, z0), (x1, y1, z1) = lo, hi
+    verts = [(x, y, z) for x in (x0, x1) for y in (y0, y1) for z in (z0, z1)]
+    faces = [(0, 1, 3, 2), (4, 6, 7, 5), (0, 4, 5, 1), (2, 3, 7, 6), (0, 2, 6, 4), (1, 5, 7, 3)]
+    mesh = bpy.data.meshes.new(name)
+    mesh.from_pydata(verts, [], faces)
+    obj = bpy.data.objects.new(name, mesh)
+    obj.pass_index = pass_index
+    scene.collection.objects.link(obj)
+    return obj
+
+
+def cycles_z_pass(scene, out_dir):
+    """Z pass of one Cycles render of the current frame, through the compositor like render_scene.py"""
+    scene.render.engine = 'CYCLES'
+    scene.cycles.device = 'CPU'
+    scene.cycles.samples = 1
+    scene.cycles.filter_width = 0.01  # sample the pixel centers the raycaster casts through
+    scene.view_layers[0].use_pass_z = True
+    scene.use_nodes = True
+    tree = scene.node_tree
+    for node in list(tree.nodes):
+        tree.nodes.remove(node)
+    rl = tree.nodes.new("CompositorNodeRLayers")
+    out = tree.nodes.new("CompositorNodeOutputFile")
+    out.base_path = str(out_dir)
+    out.file_slots[0].path = "depth_"
+    out.format.file_format = 'OPEN_EXR'
+    out.format.color_depth = '32'
+    out.format.color_mode = 'BW'
+    tree.links.new(rl.outputs["Depth"], out.inputs[0])
+    scene.frame_set(1)
+    bpy.ops.render.render(write_still=False)
+    return depth_raycast.read_depth_exr(str(out_dir / "depth_0001.exr"))
+
+
+def test_raycast_matches_cycles_z_pass(tmp_path):
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+    scene = bpy.context.scene
+    scene.render.resolution_x, scene.render.resolution_y = WIDTH, HEIGHT
+    scene.render.resolution_percentage = 100
+    cam = bpy.data.objects.new("Camera", bpy.data.cameras.new("Camera"))
+    scene.collection.objects.link(cam)
+    scene.camera = cam
+    cam.data.shift_x, cam.data.shift_y = 0.05, -0.02
+    cam.data.clip_end = 50.0
+    # camera at the origin looking down -Z: a wall over the left half, a box to the right, nothing elsewhere
+    add_box(scene, "wall", (-4.0, -3.0, -3.2), (0.3, 3.0, -3.0), 1)
+    add_box(scene, "box", (0.6, -0.4, -6.5), (1.4, 0.4, -6.0), 2)
+
+    depth, index = depth_raycast.DepthRaycaster(scene, cam, WIDTH, HEIGHT).render(with_index=True)
+    z = cycles_z_pass(scene, tmp_path)
+
+    miss = depth == depth_raycast.BACKGROUND_DEPTH
+    assert miss.any() and (~miss).any()
+    np.testing.assert_array_equal(index[miss], 0)
+    assert set(np.unique(index[~miss])) == {1, 2}
+    # Cycles writes 1e10 where nothing is hit; only silhouette pixels may differ
+    agree = np.isclose(depth, z, rtol=1e-4)
+    assert agree.mean() > 0.98
+    assert np.all(z[miss & agree] == np.float32(depth_raycast.BACKGROUND_DEPTH))
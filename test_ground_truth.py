@@ -0,0 +1,67 @@
+import numpy as np
+
+import camera_config
+import gt_geometry
+
+# render_scene.py cfg and setup_l515_camera
+CFG = camera_config.L515
+WIDTH, HEIGHT = CFG["img_w"], CFG["img_h"]
+FRAME = camera_config.view_frame(CFG)
+
+
+def box_behind_opening(half=(0.5, 0.3), distance=3.0):
+    """Depth map of a panel at `distance` seen through an opening of exactly its size at 1 m, and samples on it"""
+    rays = camera_config.frame_rays(FRAME, WIDTH, HEIGHT)
+    hit = rays[:, :2] * distance
+    inside = (np.abs(hit[:, 0]) <= half[0]) & (np.abs(hit[:, 1]) <= half[1])
+    depth = np.where(inside, distance, 1.0).reshape(HEIGHT, WIDTH).astype(np.float32)
+    # samples a pixel footprint inside the panel border
+    x, y = np.meshgrid(np.linspace(-half[0] + 0.01, half[0] - 0.01, 60), np.linspace(-half[1] + 0.01, half[1] - 0.01, 40))
+    points = np.column_stack([x.ravel(), y.ravel(), np.full(x.size, -distance)])
+    return depth, points
+
+
+def test_render_intrinsics_are_the_l515_cfg():
+    fx, fy, cx, cy = camera_config.frame_intrinsics(FRAME, WIDTH, HEIGHT)
+    # square pixels: the render has fy = fx
+    np.testing.assert_allclose((fx, fy, cx, cy), (CFG["fx"], CFG["fx"], CFG["cx"], CFG["cy"]), rtol=1e-9)
+
+
+def test_frame_intrinsics_match_camera_rays():
+    fx, fy, cx, cy = camera_config.frame_intrinsics(FRAME, WIDTH, HEIGHT)
+    rays = camera_config.frame_rays(FRAME, WIDTH, HEIGHT)
+    u, v, z = camera_config.project(rays, np.eye(4), fx, fy, cx, cy)
+    v_expected, u_expected = np.mgrid[0:HEIGHT, 0:WIDTH] + 0.5
+    np.testing.assert_allclose(u.reshape(HEIGHT, WIDTH), u_expected, atol=1e-6)
+    np.testing.assert_allclose(v.reshape(HEIGHT, WIDTH), v_expected, atol=1e-6)
+    np.testing.assert_allclose(z, 1.0)
+
+
+def test_fully_visible_box():
+    depth, points = box_behind_opening()
+    owner = np.zeros(len(points), dtype=np.int64)
+    intrinsics = camera_config.frame_intrinsics(FRAME, WIDTH, HEIGHT)
+    in_view, pixels, vis = gt_geometry.visibility(points, owner, 1, depth, np.eye(4), intrinsics)
+    assert in_view[0] == 1.0 and pixels[0] > 0
+    assert vis[0] > 0.99
+    # a principal point 40 px off puts the box partly on the occluding ring
+    fx, fy, cx, cy = intrinsics
+    _, _, vis_off = gt_geometry.visibility(points, owner, 1, depth, np.eye(4), (fx, fy, cx + 40, cy))
+    assert vis_off[0] < 0.9
+
+
+def test_yaw_boxes_of_rotated_cube():
+    corners = np.array([[x, y, z] for x in (-1, 1) for y in (-0.5, 0.5) for z in (0, 2)], dtype=np.float64)
+    yaw = np.pi / 6
+    c, s = np.cos(yaw), np.sin(yaw)
+    verts = corners @ np.array([[c, s, 0], [-s, c, 0], [0, 0, 1]]) + (3.0, -1.0, 0.0)
+    center, size = gt_geometry.yaw_boxes(verts, np.array([0]), np.array([yaw]))
+    np.testing.assert_allclose(center[0], (3.0, -1.0, 1.0), atol=1e-9)
+    np.testing.assert_allclose(size[0], (2.0, 1.0, 2.0), atol=1e-9)
+
+
+def test_render_hfov_is_the_l515_fov():
+    # scene_setup.CAMERA_HFOV picks texture tiers with this
+    assert abs(np.degrees(camera_config.render_hfov(CFG)) - CFG["fov_h"]) < 0.01
+    fx, _, _, _ = camera_config.frame_intrinsics(FRAME, WIDTH, HEIGHT)
+    assert np.isclose(camera_config.render_hfov(CFG), 2 * np.arctan(WIDTH / 2 / fx))
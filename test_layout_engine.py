@@ -0,0 +1,48 @@
+import numpy as np
+
+import layout_engine
+
+ROOM = "rooms/cvrlab.json"
+
+
+def wall_obbs(room):
+    return [layout_engine.obb_tuple(*center.tolist(), yaw, *half.tolist())
+            for center, yaw, half in layout_engine.room_wall_boxes(room)]
+
+
+def test_outer_wall_faces_are_obstacles():
+    room = layout_engine.load_room(ROOM)
+    walls = wall_obbs(room)
+    # inside the footprint (y < 3.4) but past the inner face of the north wall (Wall2, y = 3.5) at 3.35
+    chair = layout_engine.obb_tuple(5.07, 3.15, 0.0, 0.25, 0.25)
+    assert any(layout_engine.obb_overlap(chair, wall) for wall in walls)
+    # east wall (Wall1, x = 6) face at 5.85
+    assert any(layout_engine.obb_overlap(layout_engine.obb_tuple(5.65, 0.0, 0.0, 0.25, 0.25), wall) for wall in walls)
+    clear = layout_engine.obb_tuple(5.07, 3.0, 0.0, 0.25, 0.25)
+    assert not any(layout_engine.obb_overlap(clear, wall) for wall in walls)
+
+
+def test_sampled_layouts_do_not_intersect_walls():
+    room = layout_engine.load_room(ROOM)
+    walls = wall_obbs(room)
+    sampler = layout_engine.LayoutSampler(room, seed=0)
+    counts = {"chair": 8, "table": 4, "double_door_cabinet": 3, "storage_cabinet": 3, "bookshelf": 4}
+    layouts = sampler.sample_many(counts, 20)
+    assert sum(map(len, layouts)) > 0
+    for placements in layouts:
+        boxes = [layout_engine.obb_tuple(p.x, p.y, p.yaw, p.width / 2, p.depth / 2) for p in placements]
+        for box in boxes:
+            assert not any(layout_engine.obb_overlap(box, wall) for wall in walls)
+        for i in range(len(boxes)):
+            assert not any(layout_engine.obb_overlap(boxes[i], other) for other in boxes[i + 1:])
+
+
+def test_against_wall_items_fill_wall_edges():
+    room = layout_engine.load_room(ROOM)
+    sampler = layout_engine.LayoutSampler(room, seed=1)
+    placements = sampler.sample({"bookshelf": 6})
+    assert len(placements) == 6
+    for p in placements:
+        # back 5 cm off an outer wall face: x = -6.65 / 5.85 (Wall1), y = -6.35 / 3.35 (Wall2)
+        gap = min(p.x + 6.65, 5.85 - p.x, p.y + 6.35, 3.35 - p.y)
+        assert np.isclose(gap, 0.05 + p.depth / 2, atol=1e-4)
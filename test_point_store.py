@@ -0,0 +1,71 @@
+import json
+
+import numpy as np
+
+import point_store
+
+
+def test_class_ids_are_shared_across_scenes(tmp_path):
+    boxes = np.zeros((2, point_store.BOX_DIM), dtype=np.float32)
+    xyz, rgb = np.zeros((4, 3), np.float32), np.zeros((4, 3), np.uint8)
+    with point_store.ShardWriter(tmp_path / "store") as writer:
+        # scene a: chair = 1, table = 2; scene b: table = 1, chair = 2
+        writer.add("a", xyz, rgb, {"instance": [0, 1, 2, 3], "semantic": [0, 1, 2, 7]}, boxes, ["chair", "table"],
+                   {"background": 0, "chair": 1, "table": 2})
+        writer.add("b", xyz, rgb, {"instance": [0, 1, 2, 3], "semantic": [0, 2, 1, -1]}, boxes, ["table", "chair"],
+                   {"background": 0, "table": 1, "chair": 2})
+
+    store = point_store.PointStore(tmp_path / "store")
+    with open(tmp_path / "store" / point_store.DATASET_FILE) as f:
+        assert json.load(f)["classes"] == store.classes
+    chair, table = store.classes.index("chair"), store.classes.index("table")
+    a, b = store[0], store[1]
+    np.testing.assert_array_equal(a["semantic"], [0, chair, table, point_store.UNLABELED])
+    np.testing.assert_array_equal(b["semantic"], [0, chair, table, point_store.UNLABELED])
+    np.testing.assert_array_equal(a["box_labels"], [chair, table])
+    np.testing.assert_array_equal(b["box_labels"], [table, chair])
+
+
+def test_pack_export_roundtrip(tmp_path):
+    rng = np.random.default_rng(0)
+    (tmp_path / "src" / "points").mkdir(parents=True)
+    (tmp_path / "src" / "superpoints").mkdir()
+    clouds = {}
+    for name, n in (("0001", 100), ("0002", 0), ("0003", 57)):
+        points = np.column_stack([rng.uniform(-5, 5, (n, 3)), rng.integers(0, 256, (n, 3)) / 255]).astype(np.float32)
+        points.tofile(tmp_path / "src" / "points" / f"{name}.bin")
+        rng.integers(0, 10, n).tofile(tmp_path / "src" / "superpoints" / f"{name}.bin")
+        clouds[name] = points
+
+    assert point_store.pack_store(tmp_path / "src", tmp_path / "store", shard_points=120) == 3
+    store = point_store.PointStore(tmp_path / "store")
+    assert len(store.shards) == 2
+    assert [sample["name"] for sample in store.stream()] == store.names == sorted(clouds)
+    i = store.index_of("0003")
+    np.testing.assert_array_equal(store.xyz(i), clouds["0003"][:, :3])
+    np.testing.assert_allclose(store.rgb(i), clouds["0003"][:, 3:6], atol=1e-6)
+
+    point_store.export_store(store, tmp_path / "out")
+    for name, points in clouds.items():
+        exported = np.fromfile(tmp_path / "out" / "points" / f"{name}.bin", dtype=np.float32).reshape(-1, 6)
+        np.testing.assert_allclose(exported, points, atol=1e-6)
+        np.testing.assert_array_equal(np.fromfile(tmp_path / "out" / "superpoints" / f"{name}.bin", dtype=np.int64),
+                                      np.fromfile(tmp_path / "src" / "superpoints" / f"{name}.bin", dtype=np.int64))
+
+
+def test_pack_keeps_float_colors(tmp_path):
+    # create_point_cloud_from_unidet colors in [-1, 1], not multiples of 1/255
+    rng = np.random.default_rng(1)
+    (tmp_path / "src" / "points").mkdir(parents=True)
+    points = np.column_stack([rng.uniform(-5, 5, (50, 3)), rng.uniform(-1, 1, (50, 3))]).astype(np.float32)
+    points.tofile(tmp_path / "src" / "points" / "0001.bin")
+
+    point_store.pack_store(tmp_path / "src", tmp_path / "store")
+    store = point_store.PointStore(tmp_path / "store")
+    rgb = store.rgb(0)
+    np.testing.assert_array_equal(rgb, points[:, 3:6])
+    assert rgb.dtype == np.float32 and isinstance(rgb.base, np.memmap)
+
+    point_store.export_store(store, tmp_path / "out")
+    exported = np.fromfile(tmp_path / "out" / "points" / "0001.bin", dtype=np.float32).reshape(-1, 6)
+    np.testing.assert_array_equal(exported, points)
@@ -0,0 +1,37 @@
+import numpy as np
+
+import room_spec
+
+# walls of the hard-coded scene_setup.py: name -> (center x, y, length along the wall, thickness, yaw mod 180)
+LEGACY_WALLS = {
+    "Wall1": (6, -1.5, 9.8, 0.3, 90),
+    "Wall1_copy1": (-6.8, -1.5, 9.8, 0.3, 90),
+    "Wall2": (-0.4, 3.5, 12.93, 0.3, 0),
+    "Wall2_copy1": (-0.4, -6.5, 12.93, 0.3, 0),
+    "Wall3": (1.32, -2.91, 6.98, 0.3, 90),
+    "Wall4": (3.725, 0.58, 4.81, 0.3, 0),
+    "Wall4_copy1": (3.725, -3.09, 4.81, 0.3, 0),
+    "Wall5": (-1.945, 0.335, 0.41, 0.41, 0),
+}
+
+
+def test_cvrlab_reproduces_the_hard_coded_room():
+    room = room_spec.load_room_spec("rooms/cvrlab.json")
+    walls = {w["name"]: w for w in room_spec.room_walls(room)}
+    assert set(walls) == set(LEGACY_WALLS)
+    for name, (x, y, length, thickness, yaw) in LEGACY_WALLS.items():
+        wall = walls[name]
+        np.testing.assert_allclose(wall["center"], (x, y), atol=1e-9, err_msg=name)
+        assert np.isclose(wall["length"], length) and wall["thickness"] == thickness, name
+        assert np.isclose(np.degrees(wall["yaw"]) % 180, yaw), name
+        # cubes of height 4 centered at z = 1.75
+        assert np.isclose(room["wall_base"] + wall["height"] / 2, 1.75), name
+
+
+def test_outer_wall_defaults():
+    room = dict(room_spec.ROOM_DEFAULTS, footprint=[[0, 0], [4, 0], [4, 3], [0, 3]])
+    walls = room_spec.room_walls(room)
+    assert [w["name"] for w in walls] == ["Wall_0", "Wall_1", "Wall_2", "Wall_3"]
+    # centred on the edges, extended by half a thickness at both ends
+    np.testing.assert_allclose(walls[0]["center"], (2, 0))
+    assert np.isclose(walls[0]["length"], 4.3)
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+import preprocess_scene
+
+
+def random_cloud(n=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    points = rng.uniform(-5, 5, (n, 3)).astype(np.float32)
+    colors = rng.integers(0, 256, (n, 3), dtype=np.uint8)
+    return points, colors
+
+
+def read_ply(path):
+    """Minimal reader for the files save_ply writes: header lines + vertex records"""
+    with open(path, "rb") as f:
+        header = []
+        while not header or header[-1] != "end_header":
+            header.append(f.readline().decode("ascii").strip())
+        labeled = "property int instance" in header
+        dtype = preprocess_scene.PLY_LABELED_VERTEX_DTYPE if labeled else preprocess_scene.PLY_VERTEX_DTYPE
+        count = int(next(line for line in header if line.startswith("element vertex")).split()[-1])
+        if "format ascii 1.0" in header:
+            rows = np.loadtxt(f, ndmin=2)
+            vertices = np.empty(len(rows), dtype=dtype)
+            for i, name in enumerate(dtype.names):
+                vertices[name] = rows[:, i]
+        else:
+            vertices = np.fromfile(f, dtype=dtype)
+    assert len(vertices) == count
+    return vertices
+
+
+@pytest.mark.parametrize("encoding", preprocess_scene.PLY_ENCODINGS)
+def test_save_ply_roundtrip(tmp_path, encoding):
+    points, colors = random_cloud()
+    path = str(tmp_path / "cloud.ply")
+    preprocess_scene.save_ply(path, points, colors, encoding)
+
+    vertices = read_ply(path)
+    xyz = np.column_stack([vertices["x"], vertices["y"], vertices["z"]])
+    rgb = np.column_stack([vertices["red"], vertices["green"], vertices["blue"]])
+    # ASCII stores %f (6 decimals)
+    np.testing.assert_allclose(xyz, points, atol=0 if encoding == "binary_little_endian" else 1e-6)
+    np.testing.assert_array_equal(rgb, colors)
+
+
+def test_save_ply_labels_roundtrip(tmp_path):
+    points, colors = random_cloud()
+    instances = np.arange(len(points), dtype=np.int32) % 7
+    semantics = instances % 3
+    path = str(tmp_path / "labeled.ply")
+    preprocess_scene.save_ply(path, points, colors, instances=instances, semantics=semantics)
+
+    vertices = read_ply(path)
+    np.testing.assert_array_equal(vertices["instance"], instances)
+    np.testing.assert_array_equal(vertices["semantic"], semantics)
+
+
+def test_save_ply_binary_size(tmp_path):
+    points, colors = random_cloud(500)
+    path = tmp_path / "cloud.ply"
+    preprocess_scene.save_ply(str(path), points, colors)
+    header = preprocess_scene.ply_header(500)
+    assert path.stat().st_size == len(header) + 500 * preprocess_scene.PLY_VERTEX_DTYPE.itemsize
+
+
+@pytest.mark.parametrize("encoding", preprocess_scene.PLY_ENCODINGS)
+def test_save_ply_visualizer_roundtrip(tmp_path, encoding):
+    pytest.importorskip("open3d")
+    import visualizer
+
+    points, colors = random_cloud()
+    path = str(tmp_path / "cloud.ply")
+    preprocess_scene.save_ply(path, points, colors, encoding)
+
+    vis = visualizer.Visualizer()
+    pcd = vis.read_point_cloud(path)
+    np.testing.assert_allclose(vis.get_xyz(pcd), points, atol=1e-5)
+    np.testing.assert_allclose(vis.get_colors(pcd), colors / 255.0, atol=1e-6)
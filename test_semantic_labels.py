@@ -0,0 +1,17 @@
+import json
+
+import numpy as np
+
+import preprocess_scene
+
+
+def test_unknown_instances_are_unlabeled(tmp_path):
+    cam_json = tmp_path / "camera.json"
+    cam_json.write_text(json.dumps({"segmentation": {
+        "instances": {"1": {"name": "Chair", "class": "chair", "class_id": 1},
+                      "3": {"name": "Table", "class": "table", "class_id": 2}},
+        "classes": {"background": 0, "chair": 1, "table": 2}}}))
+    instances = np.array([[0, 1, 2, 3], [4, 99, -5, 1]], dtype=np.int32)
+    labels = preprocess_scene.semantic_labels(instances, str(cam_json))
+    unlabeled = preprocess_scene.UNLABELED
+    np.testing.assert_array_equal(labels, [[0, 1, unlabeled, 2], [unlabeled, unlabeled, unlabeled, 1]])
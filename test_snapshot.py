@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("open3d")
+import snapshot
+
+
+def test_empty_cloud_gives_blank_sheet():
+    snap = snapshot.Snapshotter(64, 48, backend="numpy")
+    images = snap.render(np.empty((0, 3)), np.empty((0, 3), dtype=np.uint8))
+    assert len(images) == len(snap.views)
+    sheet = snap.contact_sheet(images)
+    assert sheet.shape == (48, 64 * len(snap.views), 3)
+    assert (sheet == 255).all()
+
+
+def test_boxes_without_points_are_drawn():
+    snap = snapshot.Snapshotter(64, 48, backend="numpy")
+    images = snap.render(np.empty((0, 3)), np.empty((0, 3)), bboxes=[[0, 0, 0, 1, 1, 1, 0]])
+    assert any((image != 255).any() for image in images)
+
+
+def test_cloud_is_drawn():
+    snap = snapshot.Snapshotter(64, 48, backend="numpy")
+    rng = np.random.default_rng(0)
+    images = snap.render(rng.uniform(-1, 1, (500, 3)), np.zeros((500, 3), dtype=np.uint8))
+    assert all((image == 0).any() for image in images)
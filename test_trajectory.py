@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+import trajectory
+
+
+@pytest.mark.parametrize("kind", ["grid", "random_walk", "orbit"])
+def test_poses_keep_clip_start_from_walls(kind):
+    walls = trajectory.RoomWalls()
+    poses = trajectory.generate(kind, 300, seed=0)
+    assert len(poses) > 0
+    xy = np.array([pose[:2, 3] for pose in poses])
+    assert walls.free(xy).all()
+    assert walls.distance(xy).min() >= trajectory.CLIP_START
+
+
+def test_random_walk_does_not_cross_walls():
+    walls = trajectory.RoomWalls()
+    xy = np.array([pose[:2, 3] for pose in trajectory.generate("random_walk", 300, seed=1)])
+    assert not any(walls.crosses(a, b) for a, b in zip(xy[:-1], xy[1:]))
+    assert len(np.unique(xy.round(6), axis=0)) > 1
+
+
+def test_crosses_interior_wall():
+    walls = trajectory.RoomWalls()
+    # Wall3 runs along x = 1.32 from y = -6.4 to 0.58
+    assert walls.crosses((1.0, -2.0), (1.6, -2.0))
+    assert not walls.crosses((1.0, -2.0), (1.1, -2.0))
+    assert not walls.crosses((1.0, 2.0), (1.6, 2.0))
+
+
+@pytest.mark.parametrize("num_poses", [1, 7, 40, 300])
+def test_grid_returns_num_poses(num_poses):
+    poses = trajectory.generate("grid", num_poses, seed=0)
+    assert len(poses) == num_poses
+    xy = np.unique(np.array([pose[:2, 3] for pose in poses]).round(6), axis=0)
+    assert len(xy) == -(-num_poses // 4)
@@ -0,0 +1,170 @@
+"""Downscaled texture tiers for scene_setup.py
+
+build_cache() writes 512 / 1K / 2K variants of every map under texture/ and
+material/ into a content-addressed directory (<cache>/<sha1>/<tier>.<ext>),
+plus index.json mapping each source path to its hash. Blender then loads the
+smallest tier that still covers the pixels the surface gets on screen
+(pick_tier), instead of always decoding the 4K originals. NumPy / OpenCV only,
+runs outside Blender.
+"""
+import argparse
+import functools
+import hashlib
+import json
+import os
+import time
+
+import cv2
+import numpy as np
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(SCRIPT_DIR, "texture_cache")
+SOURCE_DIRS = ("texture", "material")
+TIERS = (512, 1024, 2048)
+IMAGE_EXTS = (".jpg", ".jpeg", ".png")
+INDEX_FILE = "index.json"
+
+
+def content_hash(path, chunk_size=1 << 20):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def find_images(root, source_dirs=SOURCE_DIRS):
+    paths = []
+    for source_dir in source_dirs:
+        for dirpath, _, filenames in os.walk(os.path.join(root, source_dir)):
+            paths += [os.path.join(dirpath, name) for name in filenames
+                      if name.lower().endswith(IMAGE_EXTS)]
+    return sorted(paths)
+
+
+def downscale(img, tier):
+    """Longest side -> tier, INTER_AREA averages texels like a mip level"""
+    height, width = img.shape[:2]
+    scale = tier / max(height, width)
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    return cv2.resize(img, size, interpolation=cv2.INTER_AREA)
+
+
+def build_cache(root=SCRIPT_DIR, cache_dir=CACHE_DIR, tiers=TIERS, source_dirs=SOURCE_DIRS):
+    """Write every missing tier, returns the index {relative source path: entry}"""
+    index = {}
+    for path in find_images(root, source_dirs):
+        stat = os.stat(path)
+        digest = content_hash(path)
+        ext = os.path.splitext(path)[1].lower()
+        entry_dir = os.path.join(cache_dir, digest)
+        entry = {"hash": digest, "size": stat.st_size, "mtime": stat.st_mtime, "tiers": {}}
+
+        img = None
+        for tier in sorted(tiers):
+            out_path = os.path.join(entry_dir, f"{tier}{ext}")
+            if not os.path.exists(out_path):
+                if img is None:
+                    # UNCHANGED keeps 16-bit displacement / alpha channels
+                    img = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+                    if img is None:
+                        print(f"Warning: Could not read {path}")
+                        break
+                if max(img.shape[:2]) <= tier:  # original is already this small
+                    break
+                os.makedirs(entry_dir, exist_ok=True)
+                cv2.imwrite(out_path, downscale(img, tier))
+            entry["tiers"][str(tier)] = os.path.relpath(out_path, cache_dir)
+        index[os.path.relpath(path, root).replace(os.sep, "/")] = entry
+
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(os.path.join(cache_dir, INDEX_FILE), "w", encoding="utf-8") as f:
+        json.dump({"root": os.path.relpath(root, cache_dir), "images": index}, f, indent=2)
+    return index
+
+
+@functools.lru_cache(maxsize=4)
+def load_index(cache_dir=CACHE_DIR):
+    index_path = os.path.join(cache_dir, INDEX_FILE)
+    if not os.path.exists(index_path):
+        return None
+    with open(index_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def resolve(path, tier, cache_dir=CACHE_DIR):
+    """Cached variant of path at tier, or path itself (no cache, stale entry, original smaller)"""
+    if tier is None:
+        return path
+    index = load_index(cache_dir)
+    if index is None:
+        return path
+    root = os.path.normpath(os.path.join(cache_dir, index["root"]))
+    entry = index["images"].get(os.path.relpath(os.path.abspath(path), root).replace(os.sep, "/"))
+    if entry is None or not os.path.exists(path):
+        return path
+    stat = os.stat(path)
+    if stat.st_size != entry["size"] or stat.st_mtime != entry["mtime"]:
+        return path
+    cached = [int(t) for t in entry["tiers"] if int(t) >= tier]
+    if not cached:
+        return path
+    return os.path.join(cache_dir, entry["tiers"][str(min(cached))])
+
+
+def pick_tier(render_width, hfov, distance, surface_size, tiers=TIERS, texels_per_pixel=1.0):
+    """
+    最小的 tier，使貼圖在畫面上每個像素至少有 texels_per_pixel 個 texel。
+    render_width : 輸出影像寬 (px)
+    hfov : 相機水平視角 (rad)
+    distance : 相機到表面的最近距離 (m)
+    surface_size : 一張貼圖在表面上覆蓋的長度 (m)
+    回傳 None 表示要用原圖。
+    """
+    pixels_per_meter = render_width / (2 * max(distance, 1e-3) * np.tan(hfov / 2))
+    needed = surface_size * pixels_per_meter * texels_per_pixel
+    for tier in sorted(tiers):
+        if tier >= needed:
+            return tier
+    return None
+
+
+def benchmark(cache_dir=CACHE_DIR, tiers=TIERS, repeats=3):
+    """Decode time and decoded RGBA float memory (what Cycles holds) per tier"""
+    index = load_index(cache_dir)
+    if index is None:
+        raise SystemExit(f"No {INDEX_FILE} in {cache_dir}, build the cache first")
+    root = os.path.normpath(os.path.join(cache_dir, index["root"]))
+    for tier in list(tiers) + [None]:
+        paths = [resolve(os.path.join(root, rel), tier, cache_dir) for rel in index["images"]]
+        start = time.perf_counter()
+        pixels = 0
+        for _ in range(repeats):
+            pixels = 0
+            for path in paths:
+                img = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+                if img is not None:
+                    pixels += img.shape[0] * img.shape[1]
+        seconds = (time.perf_counter() - start) / repeats
+        name = "original" if tier is None else str(tier)
+        print(f"[Tier {name:>8}] {len(paths)} maps, decode {seconds * 1000:.0f} ms, "
+              f"{pixels * 4 / 2**20:.0f} MB as RGBA8, {pixels * 16 / 2**20:.0f} MB as RGBA float")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build downscaled texture tiers for scene_setup.py")
+    parser.add_argument("--root", default=SCRIPT_DIR, help="directory that contains texture/ and material/")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--tiers", type=int, nargs="+", default=list(TIERS))
+    parser.add_argument("--benchmark", action="store_true", help="report decode time / memory per tier")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    start = time.perf_counter()
+    index = build_cache(args.root, args.cache_dir, args.tiers)
+    print(f"[DONE] {len(index)} textures -> {args.cache_dir} in {time.perf_counter() - start:.1f}s")
+    if args.benchmark:
+        load_index.cache_clear()
+        benchmark(args.cache_dir, args.tiers)
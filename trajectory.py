@@ -0,0 +1,216 @@
+"""Camera trajectories for render_scene.py
+
+A pose is a 4x4 camera-to-world matrix in Blender's camera convention
+(camera looks along -Z, up is +Y), the same matrix that camera.json stores
+as "camera_to_world_4x4". This module only needs NumPy, so trajectories can
+be generated outside Blender and passed to render_scene.py as a JSON file.
+
+Generators take the room_builder spec (rooms/*.json) the scene was built
+from: camera positions keep clip_start away from every outer / interior
+wall (closer geometry would be clipped out of the depth) and random-walk
+steps never pass through a wall.
+"""
+import json
+import os
+
+import numpy as np
+
+import camera_config
+import layout_engine
+
+DEFAULT_ROOM = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rooms", "cvrlab.json")
+CLIP_START = camera_config.L515["min_depth"]  # render_scene.py camera clip_start
+
+
+class RoomWalls:
+    """Wall boxes of a room spec (layout_engine.room_wall_boxes) for clearance / crossing tests"""
+
+    def __init__(self, room=DEFAULT_ROOM):
+        if isinstance(room, str):
+            room = layout_engine.load_room(room)
+        self.footprint = np.asarray(room["footprint"], dtype=np.float64)
+        boxes = layout_engine.room_wall_boxes(room)
+        self.centers = np.array([center for center, _, _ in boxes])
+        yaws = np.array([yaw for _, yaw, _ in boxes])
+        self.axes = np.stack([np.cos(yaws), np.sin(yaws)], 1)  # local +X of every wall
+        self.halves = np.array([half for _, _, half in boxes])
+
+    @property
+    def bounds(self):
+        """(xmin, xmax, ymin, ymax) of the footprint"""
+        (xmin, ymin), (xmax, ymax) = self.footprint.min(0), self.footprint.max(0)
+        return xmin, xmax, ymin, ymax
+
+    def _local(self, points):
+        """(N, 2) world xy -> (N, walls, 2) coordinates in every wall's frame"""
+        d = np.asarray(points, dtype=np.float64)[:, None] - self.centers
+        ax, ay = self.axes[:, 0], self.axes[:, 1]
+        return np.stack([d[..., 0] * ax + d[..., 1] * ay, d[..., 1] * ax - d[..., 0] * ay], -1)
+
+    def distance(self, points):
+        """(N,) distance of xy points to the nearest wall, 0 inside a wall"""
+        outside = np.maximum(np.abs(self._local(points)) - self.halves, 0)
+        return np.sqrt((outside ** 2).sum(-1)).min(1)
+
+    def free(self, points, clearance=CLIP_START):
+        """(N,) True where a point is inside the footprint and clearance away from every wall"""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        return layout_engine.points_in_polygon(points, self.footprint) & (self.distance(points) >= clearance)
+
+    def crosses(self, a, b, clearance=0.0):
+        """True if the segment a -> b passes through a wall grown by clearance (slab test)"""
+        la, lb = self._local(np.array([a, b]))
+        delta = lb - la
+        half = self.halves + clearance
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t0, t1 = (-half - la) / delta, (half - la) / delta
+        # axis parallel to the segment: inside the slab for all t or for none
+        parallel = delta == 0
+        inside = np.abs(la) <= half
+        enter = np.where(parallel, np.where(inside, 0.0, np.inf), np.minimum(t0, t1)).max(1)
+        leave = np.where(parallel, np.where(inside, 1.0, -np.inf), np.maximum(t0, t1)).min(1)
+        return bool(np.any((enter <= leave) & (leave >= 0) & (enter <= 1)))
+
+
+def look_at(eye, target, up=(0, 0, 1)):
+    """Camera-to-world matrix of a camera at eye looking at target"""
+    eye = np.asarray(eye, dtype=np.float64)
+    forward = np.asarray(target, dtype=np.float64) - eye
+    forward /= np.linalg.norm(forward)
+    right = np.cross(forward, up)
+    if np.linalg.norm(right) < 1e-8:  # looking straight up/down
+        right = np.cross(forward, (0, 1, 0))
+    right /= np.linalg.norm(right)
+    cam_up = np.cross(right, forward)
+
+    pose = np.eye(4)
+    pose[:3, 0] = right
+    pose[:3, 1] = cam_up
+    pose[:3, 2] = -forward
+    pose[:3, 3] = eye
+    return pose
+
+
+def yaw_pose(location, yaw, pitch=0.0):
+    """Camera at location, heading yaw (rad, 0 = +Y) tilted by pitch (rad, + = up)"""
+    direction = np.array([-np.sin(yaw) * np.cos(pitch), np.cos(yaw) * np.cos(pitch), np.sin(pitch)])
+    return look_at(location, np.asarray(location, dtype=np.float64) + direction)
+
+
+def orbit_poses(center, radius, height, num_poses, target_height=None):
+    """num_poses cameras on a horizontal circle, all looking at center"""
+    center = np.asarray(center, dtype=np.float64)
+    target = center.copy()
+    if target_height is not None:
+        target[2] = target_height
+    angles = np.linspace(0, 2 * np.pi, num_poses, endpoint=False)
+    return [look_at((center[0] + radius * np.cos(a), center[1] + radius * np.sin(a), height), target)
+            for a in angles]
+
+
+def random_walk_poses(num_poses, walls, height=1.4, step=0.15, turn_std=0.3,
+                      pitch_range=(-0.3, 0.1), clip_start=CLIP_START, max_turns=16, seed=0):
+    """Smooth random walk through the free floor of walls, the camera faces its walking direction
+
+    A step that would end within clip_start of a wall or cross one turns the
+    camera around, then to random headings; the camera stays put if all fail.
+    """
+    rng = np.random.default_rng(seed)
+    xmin, xmax, ymin, ymax = walls.bounds
+    starts = rng.uniform((xmin, ymin), (xmax, ymax), (1000, 2))
+    free = starts[walls.free(starts, clip_start)]
+    if not len(free):
+        raise ValueError(f"No floor position is {clip_start} m away from the walls")
+    position = free[0]
+    yaw = rng.uniform(-np.pi, np.pi)
+    poses = []
+    for _ in range(num_poses):
+        pitch = rng.uniform(*pitch_range)
+        poses.append(yaw_pose((position[0], position[1], height), yaw, pitch))
+        yaw += rng.normal(0.0, turn_std)
+        for turn in range(max_turns):
+            if turn == 1:  # bounce off the wall
+                yaw += np.pi
+            elif turn > 1:
+                yaw = rng.uniform(-np.pi, np.pi)
+            nxt = position + step * np.array([-np.sin(yaw), np.cos(yaw)])
+            if walls.free(nxt, clip_start)[0] and not walls.crosses(position, nxt):
+                position = nxt
+                break
+    return poses
+
+
+def grid_points(walls, spacing, clip_start=CLIP_START):
+    """Free (x, y) points of a regular grid over the room bounds"""
+    xmin, xmax, ymin, ymax = walls.bounds
+    xs = np.arange(xmin + spacing / 2, xmax, spacing)
+    ys = np.arange(ymin + spacing / 2, ymax, spacing)
+    points = np.stack(np.meshgrid(xs, ys), -1).reshape(-1, 2)
+    return points[walls.free(points, clip_start)]
+
+
+def grid_spacing(walls, num_points, clip_start=CLIP_START, min_spacing=0.05, iterations=40):
+    """Largest grid spacing (bisection) that still leaves at least num_points free points"""
+    xmin, xmax, ymin, ymax = walls.bounds
+    lo, hi = min_spacing, max(xmax - xmin, ymax - ymin)
+    if len(grid_points(walls, lo, clip_start)) < num_points:
+        raise ValueError(f"The room has fewer than {num_points} free grid points at {min_spacing} m spacing")
+    for _ in range(iterations):
+        mid = (lo + hi) / 2
+        if len(grid_points(walls, mid, clip_start)) >= num_points:
+            lo = mid
+        else:
+            hi = mid
+    return lo
+
+
+def grid_poses(walls, spacing=1.5, height=1.4, num_yaws=4, clip_start=CLIP_START, num_poses=None):
+    """Cameras on a regular grid over the free floor, num_yaws headings per point
+
+    num_poses: exactly this many poses; the spacing is then derived from it
+    and the points are picked evenly from the grid (the last point may get
+    fewer headings)
+    """
+    if num_poses is not None:
+        num_points = -(-num_poses // num_yaws)
+        spacing = grid_spacing(walls, num_points, clip_start)
+    points = grid_points(walls, spacing, clip_start)
+    if num_poses is not None:
+        points = points[np.linspace(0, len(points), num_points, endpoint=False).astype(int)]
+    yaws = np.linspace(0, 2 * np.pi, num_yaws, endpoint=False)
+    poses = [yaw_pose((x, y, height), yaw) for x, y in points for yaw in yaws]
+    return poses if num_poses is None else poses[:num_poses]
+
+
+def generate(kind, num_poses=100, seed=0, room=DEFAULT_ROOM, height=1.4, clip_start=CLIP_START):
+    """Named generators used by the render_scene.py command line, room: spec path or dict"""
+    walls = RoomWalls(room)
+    if kind == "orbit":
+        xmin, xmax, ymin, ymax = walls.bounds
+        center = np.array([(xmin + xmax) / 2, (ymin + ymax) / 2])
+        radius = 0.35 * min(xmax - xmin, ymax - ymin)
+        # num_poses evenly spaced over the free part of the circle
+        angles = np.linspace(0, 2 * np.pi, 64 * num_poses, endpoint=False)
+        circle = center + radius * np.stack([np.cos(angles), np.sin(angles)], 1)
+        free = angles[walls.free(circle, clip_start)]
+        if not len(free):
+            raise ValueError(f"The orbit of radius {radius:.2f} m has no position {clip_start} m away from the walls")
+        angles = free[np.linspace(0, len(free), num_poses, endpoint=False).astype(int)]
+        return [look_at((center[0] + radius * np.cos(a), center[1] + radius * np.sin(a), height), (*center, height))
+                for a in angles]
+    if kind == "random_walk":
+        return random_walk_poses(num_poses, walls, height, clip_start=clip_start, seed=seed)
+    if kind == "grid":
+        return grid_poses(walls, height=height, clip_start=clip_start, num_poses=num_poses)
+    raise ValueError(f"Unknown trajectory '{kind}', expected orbit, random_walk or grid")
+
+
+def save_trajectory(path, poses):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"camera_to_world_4x4": [np.asarray(p).tolist() for p in poses]}, f, indent=2)
+
+
+def load_trajectory(path):
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return [np.array(p, dtype=np.float64) for p in data["camera_to_world_4x4"]]
@@ -1,8 +1,82 @@
-from sklearn.neighbors import NearestNeighbors
+import argparse
+import time
+
 import numpy as np
 import open3d as o3d
 import matplotlib.pyplot as plt
 import json
+from label_transfer import LabelTransfer
+
+COLOR_TABLE = {
+    "table": (0.0, 1.0, 0.0),  # 綠色
+    "chair": (0.0, 0.5, 1.0),  # 藍色
+    # 您可以在這裡加入更多類別...
+    # "sofa": (1.0, 0.0, 0.0), # 紅色
+    "default": (0.5, 0.5, 0.5) # 灰色
+}
+
+# unit box corners (bottom 0-3, top 4-7) and its 12 edges
+BBOX_UNIT_CORNERS = np.array([
+    [-1, -1, -1], [1, -1, -1], [1, 1, -1], [-1, 1, -1],
+    [-1, -1, 1], [1, -1, 1], [1, 1, 1], [-1, 1, 1],
+], dtype=np.float64) / 2
+BBOX_EDGES = np.array([
+    [0, 1], [1, 2], [2, 3], [3, 0],
+    [4, 5], [5, 6], [6, 7], [7, 4],
+    [0, 4], [1, 5], [2, 6], [3, 7],
+], dtype=np.int32)
+
+
+def bbox_corners(bboxes):
+    """(N, 7) [x, y, z, dx, dy, dz, heading] -> (N, 8, 3) corners, yaw about +Z"""
+    bboxes = np.asarray(bboxes, dtype=np.float64)
+    local = BBOX_UNIT_CORNERS[None, :, :] * bboxes[:, None, 3:6]
+    c, s = np.cos(bboxes[:, 6]), np.sin(bboxes[:, 6])
+    x = c[:, None] * local[..., 0] - s[:, None] * local[..., 1]
+    y = s[:, None] * local[..., 0] + c[:, None] * local[..., 1]
+    return np.stack([x, y, local[..., 2]], axis=-1) + bboxes[:, None, :3]
+
+
+def bbox_lineset(bboxes, box_colors):
+    """One LineSet with the wireframes of all boxes, box_colors: (N, 3) in [0, 1]"""
+    n = len(bboxes)
+    corners = bbox_corners(bboxes).reshape(-1, 3)
+    lines = (BBOX_EDGES[None, :, :] + 8 * np.arange(n)[:, None, None]).reshape(-1, 2)
+    lineset = o3d.geometry.LineSet()
+    lineset.points = o3d.utility.Vector3dVector(corners)
+    lineset.lines = o3d.utility.Vector2iVector(lines)
+    lineset.colors = o3d.utility.Vector3dVector(np.repeat(box_colors, len(BBOX_EDGES), axis=0))
+    return lineset
+
+
+def _per_box_linesets(bboxes, color=(1, 0, 0)):
+    """One OrientedBoundingBox + LineSet per box, the path bbox_lineset replaced (benchmark reference)"""
+    linesets = []
+    for box in bboxes:
+        R = o3d.geometry.OrientedBoundingBox.get_rotation_matrix_from_axis_angle([0, 0, box[6]])
+        lineset = o3d.geometry.LineSet.create_from_oriented_bounding_box(
+            o3d.geometry.OrientedBoundingBox(box[:3], R, box[3:6]))
+        lineset.paint_uniform_color(color)
+        linesets.append(lineset)
+    return linesets
+
+
+def benchmark_bbox_lines(counts=(1000, 10000), repeats=3):
+    """ms to build the wireframes of N random boxes: merged LineSet vs. one LineSet per box"""
+    rng = np.random.default_rng(0)
+    for n in counts:
+        bboxes = np.column_stack([rng.uniform(-10, 10, (n, 3)), rng.uniform(0.2, 2, (n, 3)),
+                                  rng.uniform(-np.pi, np.pi, n)])
+        colors = np.tile([1.0, 0.0, 0.0], (n, 1))
+        for name, build in (("per box", lambda: _per_box_linesets(bboxes)),
+                            ("merged", lambda: bbox_lineset(bboxes, colors)),
+                            ("corners only", lambda: bbox_corners(bboxes))):
+            start = time.perf_counter()
+            for _ in range(repeats):
+                build()
+            ms = (time.perf_counter() - start) / repeats * 1000
+            print(f"[BBox {name:>12}] {n} boxes: {ms:.1f} ms")
+
 
 class Operator():
     def __init__(self):
@@ -24,21 +98,23 @@ class Operator():
 class Visualizer(Operator):
     def __init__(self):
         super().__init__()
-    def _create_bbox_lines(self, bboxes, color=[1, 0, 0]):
+        self.label_transfer = LabelTransfer()
+
+    def _create_bbox_lines(self, bboxes, color=[1, 0, 0], labels=None, color_table=None):
         """
         bboxes: (N, 7) [x, y, z, dx, dy, dz, heading]
+        labels: optional (N,) class names, colored through color_table
+        All boxes go into one merged LineSet.
         """
-        linesets = []
-        for box in bboxes:
-            center = box[:3]
-            size = box[3:6]
-            # center[2] += size[2] / 2
-            R = o3d.geometry.OrientedBoundingBox.get_rotation_matrix_from_axis_angle([0, 0, box[6]])
-            obb = o3d.geometry.OrientedBoundingBox(center, R, size)
-            lineset = o3d.geometry.LineSet.create_from_oriented_bounding_box(obb)
-            lineset.paint_uniform_color(color)
-            linesets.append(lineset)
-        return linesets
+        bboxes = np.asarray(bboxes, dtype=np.float64).reshape(-1, 7)
+        if len(bboxes) == 0:
+            return []
+        if labels is not None:
+            table = COLOR_TABLE if color_table is None else color_table
+            box_colors = np.array([table.get(label, table["default"]) for label in labels], dtype=np.float64)
+        else:
+            box_colors = np.tile(np.asarray(color, dtype=np.float64), (len(bboxes), 1))
+        return [bbox_lineset(bboxes, box_colors)]
 
     def create_point_cloud_from_unidet(self, points):
         pcd = o3d.geometry.PointCloud()
@@ -48,26 +124,29 @@ class Visualizer(Operator):
         pcd.colors = o3d.utility.Vector3dVector(rgb)
         return pcd
 
-    def read_point_cloud_bin(self, pc_file):
-        points = np.fromfile(pc_file, dtype=np.float32).reshape(-1, 6)
+    def create_point_cloud(self, xyz, rgb):
         pcd = o3d.geometry.PointCloud()
-        xyz = np.array(points)[:, :3]
-        print(xyz.shape)
-        rgb = (np.array(points)[:, 3:6])  # RGB 必須是 0~1
         pcd.points = o3d.utility.Vector3dVector(xyz)
-        pcd.colors = o3d.utility.Vector3dVector(rgb)
+        pcd.colors = o3d.utility.Vector3dVector(rgb)  # RGB 必須是 0~1
         return pcd
 
+    def read_point_cloud_bin(self, pc_file):
+        points = np.fromfile(pc_file, dtype=np.float32).reshape(-1, 6)
+        xyz = points[:, :3]
+        print(xyz.shape)
+        return self.create_point_cloud(xyz, points[:, 3:6])
+
     def read_superpoints(self, sp_file):
         superpoints = np.fromfile(sp_file, dtype=np.int64)
         return superpoints
 
+    def read_point_cloud_store(self, store, i):
+        """Sample i of a point_store.PointStore, without reading other samples"""
+        return self.create_point_cloud(store.xyz(i), store.rgb(i))
+
     def paint_sp(self, xyz_orig, vertices, superpoints):
-        nbrs = NearestNeighbors(n_neighbors=1).fit(vertices)
-        _, indices = nbrs.kneighbors(xyz_orig)
-        print(indices.shape)
-        mapped_labels = superpoints[indices.flatten()]  # shape: (N,)
-        # mapped_labels = superpoints[indices]  # shape: (N,)
+        # KD-tree per vertex set is cached; xyz_orig is vertices -> no search
+        mapped_labels = self.label_transfer.transfer(xyz_orig, vertices, superpoints)  # shape: (N,)
         cmap = plt.get_cmap("tab20")
         colors_sp = cmap(mapped_labels % 20)[:, :3]  # shape: (N, 3)
         painted_sp = o3d.geometry.PointCloud(
@@ -84,15 +163,31 @@ class Visualizer(Operator):
         pcd = o3d.io.read_point_cloud(pc_file)
         return pcd
 
-    def show(self, data, bboxes=None):
+    def snapshot(self, data, png_path, bboxes=None, labels=None, snapshotter=None):
+        """Off-screen version of show(): write all views of data to one PNG"""
+        import snapshot  # snapshot imports this module
+        snapshotter = snapshotter or snapshot.Snapshotter()
+        box_colors = None
+        if bboxes is not None and labels is not None:
+            box_colors = np.array([COLOR_TABLE.get(label, COLOR_TABLE["default"]) for label in labels])
+        images = snapshotter.render(self.get_xyz(data), self.get_colors(data), bboxes, box_colors)
+        snapshot.save_png(png_path, snapshotter.contact_sheet(images))
+        return png_path
+
+    def show(self, data, bboxes=None, labels=None):
         if bboxes is not None:
-            bbox_linesets = self._create_bbox_lines(bboxes)
+            bbox_linesets = self._create_bbox_lines(bboxes, labels=labels)
             o3d.visualization.draw_geometries([data] + bbox_linesets)
         else:
             o3d.visualization.draw_geometries([data])
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Visualizer demo")
+    parser.add_argument("--benchmark", action="store_true", help="time bbox wireframes for 1k / 10k boxes and exit")
+    if parser.parse_args().benchmark:
+        benchmark_bbox_lines()
+        raise SystemExit
     vis = Visualizer()
     # pcd = vis.read_point_cloud('zed_data\point_cloud_PLY_36207547_720_05-08-2025-15-38-18.ply')
     pcd = vis.read_point_cloud_bin(r'sunrgbd\points\000001.bin')